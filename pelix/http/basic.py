@@ -81,6 +81,9 @@ LOCALHOST_ADDRESS = "127.0.0.1"
 Local address, if None is given as binding address, instead of the default one
 """
 
+MAX_CACHED_PATHS = 256
+""" Maximum number of request paths kept in the servlet lookup cache """
+
 # ------------------------------------------------------------------------------
 
 
@@ -478,6 +481,9 @@ class HttpServiceImpl(http.HTTPService):
         # Path -> (servlet, parameters)
         self._servlets: Dict[str, Tuple[http.Servlet, Dict[str, Any]]] = {}
 
+        # Request path -> Matching servlet path ("" if none)
+        self._servlets_cache: Dict[str, str] = {}
+
         # Fields injected by iPOPO
         self._servlets_services: List[http.Servlet] = []
         self._error_handler: Optional[http.ErrorHandler] = None
@@ -669,19 +675,26 @@ class HttpServiceImpl(http.HTTPService):
             path += "/"
 
         with self._lock:
-            longest_match = ""
-            longest_match_len = 0
-            for servlet_path in self._servlets:
-                tested_path = servlet_path
-                if tested_path[-1] != "/":
-                    # Add a trailing slash
-                    tested_path += "/"
-
-                if path.startswith(tested_path) and len(servlet_path) > longest_match_len:
-                    # Found a corresponding servlet
-                    # which is deeper than the previous one
-                    longest_match = servlet_path
-                    longest_match_len = len(servlet_path)
+            longest_match = self._servlets_cache.get(path)
+            if longest_match is None:
+                longest_match = ""
+                longest_match_len = 0
+                for servlet_path in self._servlets:
+                    tested_path = servlet_path
+                    if tested_path[-1] != "/":
+                        # Add a trailing slash
+                        tested_path += "/"
+
+                    if path.startswith(tested_path) and len(servlet_path) > longest_match_len:
+                        # Found a corresponding servlet
+                        # which is deeper than the previous one
+                        longest_match = servlet_path
+                        longest_match_len = len(servlet_path)
+
+                # Keep the cache bounded, as request paths come from clients
+                if len(self._servlets_cache) >= MAX_CACHED_PATHS:
+                    self._servlets_cache.clear()
+                self._servlets_cache[path] = longest_match
 
             # Return the found servlet
             if not longest_match:
@@ -804,6 +817,7 @@ class HttpServiceImpl(http.HTTPService):
             if self.__safe_callback(servlet, "bound_to", path, parameters):
                 # Store the servlet
                 self._servlets[path] = (servlet, parameters)
+                self._servlets_cache.clear()
                 return True
 
             # The servlet refused the binding
@@ -853,6 +867,7 @@ class HttpServiceImpl(http.HTTPService):
                     del self._servlets[path]
                 except KeyError:
                     self.log(logging.DEBUG, "Tried to remove an unknown servlet path: %s", path)
+                self._servlets_cache.clear()
                 return True
 
     def log(self, level: int, message: str, *args: Any, **kwargs: Any) -> None:
@@ -1032,6 +1047,7 @@ class HttpServiceImpl(http.HTTPService):
 
         # Clean up
         self._servlets.clear()
+        self._servlets_cache.clear()
         self._thread = None
         self._server = None
         self._logger = None
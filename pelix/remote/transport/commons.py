@@ -85,21 +85,23 @@ class AbstractRpcServiceExporter(pelix.remote.RemoteServiceExportProvider):
         """
         Called by the servlet: calls the method of an exported service
         """
-        # Get the best matching name
+        # Get the best matching name: the longest end point name followed by
+        # a dot, i.e. the known prefix ending at the right-most dot
         matching = None
-        len_found = 0
-        for name in self.__endpoints:
-            if len(name) > len_found and method.startswith(name + "."):
-                # Better matching end point name (longer that previous one)
-                matching = name
-                len_found = len(matching)
+        idx = method.rfind(".")
+        while idx > 0:
+            if method[:idx] in self.__endpoints:
+                matching = method[:idx]
+                break
+
+            idx = method.rfind(".", 0, idx)
 
         if matching is None:
             # No end point name match
             raise RemoteServiceError(f"No end point found for: {method}")
 
         # Extract the method name. (+1 for the trailing dot)
-        method_name = method[len_found + 1 :]
+        method_name = method[idx + 1 :]
 
         # Get the service
         try:
@@ -6,7 +6,9 @@ Test package for Pelix
 :author: Thomas Calmant
 """
 
+import contextlib
 import logging
+from typing import Iterator
 
 
 def log_on() -> None:
@@ -21,3 +23,16 @@ def log_off() -> None:
     Disables the logging
     """
     logging.disable(logging.CRITICAL)
+
+
+@contextlib.contextmanager
+def log_disabled() -> Iterator[None]:
+    """
+    Disables the logging in a block, then restores the previous state
+    """
+    previous = logging.root.manager.disable
+    logging.disable(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        logging.disable(previous)
@@ -373,7 +373,11 @@ def test_fct():
         )
 
         # Validate get_location()
-        bundle_without_ext = os.path.splitext(bundle.get_location())[0]
+        location = bundle.get_location()
+        if location.endswith(".py"):
+            bundle_without_ext = location[:-3]
+        else:
+            bundle_without_ext = os.path.splitext(location)[0]
         full_bundle_path = os.path.abspath(bundle_without_ext)
         self.assertIn(self.test_bundle_loc, (bundle_without_ext, full_bundle_path))
 
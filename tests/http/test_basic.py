@@ -10,12 +10,13 @@ import http.client as httplib
 import logging
 import unittest
 from types import ModuleType
-from typing import Any, Dict, Optional, Tuple, cast
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, cast
 
 import pelix.http as http
-from pelix.framework import BundleContext, Framework, FrameworkFactory
+from pelix.framework import Framework, FrameworkFactory
 from pelix.ipopo.constants import IPopoService
-from tests import log_off, log_on
+from tests import log_disabled
+from tests.ipopo import install_bundle, install_ipopo
 
 # ------------------------------------------------------------------------------
 
@@ -25,46 +26,14 @@ __version__ = ".".join(str(x) for x in __version_info__)
 DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 8080
 
-# ------------------------------------------------------------------------------
-
-
-def install_bundle(framework: Framework, bundle_name: str) -> ModuleType:
-    """
-    Installs and starts the test bundle and returns its module
-
-    :param framework: A Pelix framework instance
-    :param bundle_name: A bundle name
-    :return: The installed bundle Python module
-    """
-    context = framework.get_bundle_context()
-
-    bundle = context.install_bundle(bundle_name)
-    bundle.start()
-
-    return bundle.get_module()
-
-
-def install_ipopo(framework: Framework) -> IPopoService:
-    """
-    Installs and starts the iPOPO bundle. Returns the iPOPO service
-
-    :param framework: A Pelix framework instance
-    :return: The iPOPO service
-    :raise Exception: The iPOPO service cannot be found
-    """
-    context = framework.get_bundle_context()
-    assert isinstance(context, BundleContext)
+# Timeout of HTTP requests (in seconds), to avoid hanging tests
+HTTP_TIMEOUT = 10
 
-    # Install & start the bundle
-    bundle = context.install_bundle("pelix.ipopo.core")
-    bundle.start()
+# Dummy servlet objects, used to test the servlets registry
+DUMMY_SERVLET_1 = cast(http.Servlet, object())
+DUMMY_SERVLET_2 = cast(http.Servlet, object())
 
-    # Get the service
-    ref = context.get_service_reference(IPopoService)
-    if ref is None:
-        raise Exception("iPOPO Service not found")
-
-    return context.get_service(ref)
+# ------------------------------------------------------------------------------
 
 
 def instantiate_server(
@@ -83,6 +52,17 @@ def instantiate_server(
     )
 
 
+def start_server(ipopo_svc: IPopoService) -> Tuple[http.HTTPService, int]:
+    """
+    Instantiates a basic server component on a random port
+
+    :param ipopo_svc: The iPOPO service
+    :return: A (HTTP service, port) tuple
+    """
+    http_svc = instantiate_server(ipopo_svc, port=0)
+    return http_svc, http_svc.get_access()[1]
+
+
 def kill_server(ipopo_svc: IPopoService) -> None:
     """
     Kills the basic server component
@@ -109,12 +89,13 @@ def get_http_page(
     :param content: POST request content
     :return: A (code, content) tuple
     """
-    conn = httplib.HTTPConnection(host, port)
-    conn.connect()
-    conn.request(method, uri, content, headers or {})
-    result = conn.getresponse()
-    data = result.read()
-    conn.close()
+    conn = httplib.HTTPConnection(host, port, timeout=HTTP_TIMEOUT)
+    try:
+        conn.request(method, uri, content, headers or {})
+        result = conn.getresponse()
+        data = result.read()
+    finally:
+        conn.close()
     return result.status, data
 
 
@@ -140,6 +121,21 @@ def get_http_code(
     return get_http_page(host, port, uri, method, headers, content)[0]
 
 
+def get_http_codes(
+    requests: Iterable[Tuple[str, str]], host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+) -> List[int]:
+    """
+    Retrieves the status codes of a sequence of HTTP requests, sent one after
+    the other
+
+    :param requests: A list of (method, uri) tuples
+    :param host: Server host name
+    :param port: Server port
+    :return: The list of status codes, in the order of the requests
+    """
+    return [get_http_page(host, port, uri, method)[0] for method, uri in requests]
+
+
 # ------------------------------------------------------------------------------
 
 
@@ -157,47 +153,62 @@ class BasicHTTPServiceServletsTest(unittest.TestCase):
 
     framework: Framework
     ipopo: IPopoService
+    servlets: ModuleType
+    servlet_class: Type[Any]
+    servlet_factory: str
+    port: int
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpClass(cls) -> None:
         """
-        Sets up the test environment
+        Starts the framework shared by all tests
         """
         # Start a framework
-        self.framework = FrameworkFactory.get_framework()
-        self.framework.start()
+        cls.framework = FrameworkFactory.get_framework()
+        cls.framework.start()
 
         # Install iPOPO
-        self.ipopo = install_ipopo(self.framework)
+        cls.ipopo = install_ipopo(cls.framework)
 
         # Install HTTP service
-        install_bundle(self.framework, "pelix.http.basic")
+        install_bundle(cls.framework, "pelix.http.basic")
 
-        # Install test bundle
-        self.servlets = install_bundle(self.framework, "tests.http.servlets_bundle")
+        # Install test bundle and keep the elements used by tests
+        cls.servlets = install_bundle(cls.framework, "tests.http.servlets_bundle")
+        cls.servlet_class = cls.servlets.SimpleServlet
+        cls.servlet_factory = cls.servlets.SIMPLE_SERVLET_FACTORY
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Stops the shared framework
+        """
+        FrameworkFactory.delete_framework()
+        cls.framework = None  # type: ignore
 
     def tearDown(self) -> None:
         """
         Cleans up the test environment
         """
-        # Stop the framework
-        FrameworkFactory.delete_framework()
-        self.framework = None  # type: ignore
+        # Kill the components left by the test (server and servlets)
+        for name, _, _ in self.ipopo.get_instances():
+            self.ipopo.kill(name)
 
     def testBlank(self) -> None:
         """
         Tests the server when no servlet is active
         """
-        instantiate_server(self.ipopo)
-        self.assertEqual(get_http_code(), 404, "Received something other than a 404")
+        _, self.port = start_server(self.ipopo)
+        self.assertEqual(get_http_code(port=self.port), 404, "Received something other than a 404")
 
     def testRegisteredServlet(self) -> None:
         """
         Tests the registration of a servlet object
         """
-        http_svc = instantiate_server(self.ipopo)
+        http_svc, self.port = start_server(self.ipopo)
 
         # Register the servlet
-        servlet = self.servlets.SimpleServlet()
+        servlet = self.servlet_class()
         self.assertTrue(http_svc.register_servlet("/test", servlet), "Servlet not registered")
 
         # Test the call back
@@ -216,15 +227,21 @@ class BasicHTTPServiceServletsTest(unittest.TestCase):
         self.assertIsNone(http_svc.get_servlet("/tes"), "Incomplete path is associated to a servlet")
 
         # Test access to /
-        self.assertEqual(get_http_code(uri="/"), 404, "Received something other than a 404")
+        self.assertEqual(get_http_code(port=self.port, uri="/"), 404, "Received something other than a 404")
 
         # Test access to /test
-        self.assertEqual(get_http_code(uri="/test", method="GET"), 200, "Servlet not registered ?")
-        self.assertEqual(get_http_code(uri="/test", method="POST"), 201, "Servlet not registered ?")
-        self.assertEqual(get_http_code(uri="/test", method="PUT"), 404, "Unwanted answer")
+        self.assertEqual(
+            get_http_code(port=self.port, uri="/test", method="GET"), 200, "Servlet not registered ?"
+        )
+        self.assertEqual(
+            get_http_code(port=self.port, uri="/test", method="POST"), 201, "Servlet not registered ?"
+        )
+        self.assertEqual(get_http_code(port=self.port, uri="/test", method="PUT"), 404, "Unwanted answer")
 
         # Sub path
-        self.assertEqual(get_http_code(uri="/test/toto", method="GET"), 200, "Servlet not registered ?")
+        self.assertEqual(
+            get_http_code(port=self.port, uri="/test/toto", method="GET"), 200, "Servlet not registered ?"
+        )
 
         # Unregister the servlet
         http_svc.unregister("/test")
@@ -235,74 +252,78 @@ class BasicHTTPServiceServletsTest(unittest.TestCase):
         servlet.reset()
 
         # Test access to /
-        self.assertEqual(get_http_code(uri="/"), 404, "Received something other than a 404")
+        self.assertEqual(get_http_code(port=self.port, uri="/"), 404, "Received something other than a 404")
 
         # Test access to /test
-        self.assertEqual(get_http_code(uri="/test", method="POST"), 404, "Servlet still registered")
+        self.assertEqual(
+            get_http_code(port=self.port, uri="/test", method="POST"), 404, "Servlet still registered"
+        )
 
         # Sub path
-        self.assertEqual(get_http_code(uri="/test/toto", method="GET"), 404, "Servlet still registered")
+        self.assertEqual(
+            get_http_code(port=self.port, uri="/test/toto", method="GET"), 404, "Servlet still registered"
+        )
 
     def testBindingRaiser(self) -> None:
         """
         Tests the behavior of the HTTP service when a bound_to() method raises
         an exception
         """
-        http_svc = instantiate_server(self.ipopo)
+        http_svc, self.port = start_server(self.ipopo)
 
         # Make the servlet raise an exception
-        servlet = self.servlets.SimpleServlet(True)
+        servlet = self.servlet_class(True)
 
         # Register the servlet
-        log_off()
-        self.assertFalse(
-            http_svc.register_servlet("/test", servlet), "Servlet registered even raising an exception"
-        )
-        log_on()
+        with log_disabled():
+            self.assertFalse(
+                http_svc.register_servlet("/test", servlet), "Servlet registered even raising an exception"
+            )
 
-        self.assertEqual(get_http_code(uri="/test"), 404, "Servlet registered even raising an exception")
+        self.assertEqual(
+            get_http_code(port=self.port, uri="/test"), 404, "Servlet registered even raising an exception"
+        )
 
     def testUnbindingRaiser(self) -> None:
         """
         Tests the behavior of the HTTP service when a bound_to() method raises
         an exception
         """
-        http_svc = instantiate_server(self.ipopo)
+        http_svc, self.port = start_server(self.ipopo)
 
         # Make the servlet to not raise an exception
-        servlet = self.servlets.SimpleServlet(False)
+        servlet = self.servlet_class(False)
 
         # Register the servlet
         self.assertTrue(http_svc.register_servlet("/test", servlet), "Servlet not registered")
-        self.assertEqual(get_http_code(uri="/test"), 200, "Servlet not registered ?")
+        self.assertEqual(get_http_code(port=self.port, uri="/test"), 200, "Servlet not registered ?")
 
         # Make it raise an exception
         servlet.raiser = True
 
         # Unregister it (no exception should be propagated)
-        log_off()
-        http_svc.unregister("/test")
-        log_on()
+        with log_disabled():
+            http_svc.unregister("/test")
 
         # The servlet must have been unregistered
-        self.assertEqual(get_http_code(uri="/test"), 404, "Servlet still registered")
+        self.assertEqual(get_http_code(port=self.port, uri="/test"), 404, "Servlet still registered")
 
     def testAcceptBinding(self) -> None:
         """
         Tests the behavior of the HTTP service when a bound_to() method raises
         an exception
         """
-        http_svc = instantiate_server(self.ipopo)
+        http_svc, self.port = start_server(self.ipopo)
 
         # Make the first servlet
-        servlet = self.servlets.SimpleServlet(False)
+        servlet = self.servlet_class(False)
 
         # Make the second servlet
-        servlet_2 = self.servlets.SimpleServlet(False)
+        servlet_2 = self.servlet_class(False)
 
         # Register the first servlet
         self.assertTrue(http_svc.register_servlet("/test", servlet), "Servlet not registered")
-        self.assertEqual(get_http_code(uri="/test"), 200, "Servlet not registered ?")
+        self.assertEqual(get_http_code(port=self.port, uri="/test"), 200, "Servlet not registered ?")
 
         # Second registration must work
         self.assertTrue(http_svc.register_servlet("/test", servlet), "Servlet not registered")
@@ -312,7 +333,7 @@ class BasicHTTPServiceServletsTest(unittest.TestCase):
         self.assertRaises(ValueError, http_svc.register_servlet, "/test", servlet_2)
 
         # Ensure that our first servlet is still there
-        self.assertEqual(get_http_code(uri="/test"), 200, "Servlet not registered ?")
+        self.assertEqual(get_http_code(port=self.port, uri="/test"), 200, "Servlet not registered ?")
 
         # Try to register the second servlet, rejecting the server
         servlet_2.accept = False
@@ -321,26 +342,25 @@ class BasicHTTPServiceServletsTest(unittest.TestCase):
         )
 
         # Ensure that our first servlet is still there
-        self.assertEqual(get_http_code(uri="/test"), 200, "Servlet not registered ?")
+        self.assertEqual(get_http_code(port=self.port, uri="/test"), 200, "Servlet not registered ?")
 
         # Unregister it (no exception should be propagated)
-        log_off()
-        http_svc.unregister("/test")
-        log_on()
+        with log_disabled():
+            http_svc.unregister("/test")
 
         # The servlet must have been unregistered
-        self.assertEqual(get_http_code(uri="/test"), 404, "Servlet still registered")
+        self.assertEqual(get_http_code(port=self.port, uri="/test"), 404, "Servlet still registered")
 
     def testWhiteboardPatternSimple(self) -> None:
         """
         Tests the whiteboard pattern with a simple path
         """
-        http_svc = instantiate_server(self.ipopo)
+        http_svc, self.port = start_server(self.ipopo)
 
         # Instantiate the servlet component
         servlet_name = "test-whiteboard-simple"
         servlet = self.ipopo.instantiate(
-            self.servlets.SIMPLE_SERVLET_FACTORY,
+            self.servlet_factory,
             servlet_name,
             {http.HTTP_SERVLET_PATH: "/test", "raiser": False},
         )
@@ -351,19 +371,18 @@ class BasicHTTPServiceServletsTest(unittest.TestCase):
         servlet.reset()
 
         # Test information
-        self.assertIs(
-            ensure_get_servlet(http_svc, "/test")[0], servlet, "get_servlet() didn't return the servlet"
+        found_servlet, _, prefix = ensure_get_servlet(http_svc, "/test")
+        self.assertIs(found_servlet, servlet, "get_servlet() didn't return the servlet")
+        self.assertEqual(prefix, "/test", "get_servlet() didn't return the prefix correctly")
+
+        # Test access to /test
+        self.assertEqual(
+            get_http_code(port=self.port, uri="/test", method="GET"), 200, "Servlet not registered ?"
         )
         self.assertEqual(
-            ensure_get_servlet(http_svc, "/test")[2],
-            "/test",
-            "get_servlet() didn't return the prefix correctly",
+            get_http_code(port=self.port, uri="/test", method="POST"), 201, "Servlet not registered ?"
         )
-
-        # Test access to /test
-        self.assertEqual(get_http_code(uri="/test", method="GET"), 200, "Servlet not registered ?")
-        self.assertEqual(get_http_code(uri="/test", method="POST"), 201, "Servlet not registered ?")
-        self.assertEqual(get_http_code(uri="/test", method="PUT"), 404, "Unwanted answer")
+        self.assertEqual(get_http_code(port=self.port, uri="/test", method="PUT"), 404, "Unwanted answer")
 
         # Kill the component
         self.ipopo.kill(servlet_name)
@@ -374,20 +393,22 @@ class BasicHTTPServiceServletsTest(unittest.TestCase):
         servlet.reset()
 
         # Test access to /test
-        self.assertEqual(get_http_code(uri="/test", method="POST"), 404, "Servlet still registered")
+        self.assertEqual(
+            get_http_code(port=self.port, uri="/test", method="POST"), 404, "Servlet still registered"
+        )
 
     def testWhiteboardPatternMultiple(self) -> None:
         """
         Tests the whiteboard pattern with a multiple paths
         """
-        http_svc = instantiate_server(self.ipopo)
+        http_svc, self.port = start_server(self.ipopo)
 
         # Instantiate the servlet component
         servlet_name = "test-whiteboard-multiple"
         paths = ["/test1", "/test2", "/test/1"]
 
         servlet = self.ipopo.instantiate(
-            self.servlets.SIMPLE_SERVLET_FACTORY,
+            self.servlet_factory,
             servlet_name,
             {http.HTTP_SERVLET_PATH: paths, "raiser": False},
         )
@@ -405,8 +426,8 @@ class BasicHTTPServiceServletsTest(unittest.TestCase):
             )
 
         # Test access to /test
-        for path in paths:
-            self.assertEqual(get_http_code(uri=path), 200, "Servlet not registered ?")
+        codes = get_http_codes([("GET", path) for path in paths], port=self.port)
+        self.assertEqual(codes, [200] * len(paths), "Servlet not registered ?")
 
         # Kill the component
         self.ipopo.kill(servlet_name)
@@ -418,20 +439,20 @@ class BasicHTTPServiceServletsTest(unittest.TestCase):
         servlet.reset()
 
         # Test access to paths
-        for path in paths:
-            self.assertEqual(get_http_code(uri=path), 404, "Servlet still registered")
+        codes = get_http_codes([("GET", path) for path in paths], port=self.port)
+        self.assertEqual(codes, [404] * len(paths), "Servlet still registered")
 
     def testWhiteboardPatternUpdate(self) -> None:
         """
         Tests the whiteboard pattern with a simple path, which path property
         is updated
         """
-        http_svc = instantiate_server(self.ipopo)
+        http_svc, self.port = start_server(self.ipopo)
 
         # Instantiate the servlet component
         servlet_name = "test-whiteboard-simple"
         servlet = self.ipopo.instantiate(
-            self.servlets.SIMPLE_SERVLET_FACTORY,
+            self.servlet_factory,
             servlet_name,
             {http.HTTP_SERVLET_PATH: "/test", "raiser": False},
         )
@@ -447,8 +468,12 @@ class BasicHTTPServiceServletsTest(unittest.TestCase):
         )
 
         # Test access to /test
-        self.assertEqual(get_http_code(uri="/test", method="GET"), 200, "Servlet not registered ?")
-        self.assertEqual(get_http_code(uri="/test-updated", method="GET"), 404, "Unwanted success")
+        self.assertEqual(
+            get_http_code(port=self.port, uri="/test", method="GET"), 200, "Servlet not registered ?"
+        )
+        self.assertEqual(
+            get_http_code(port=self.port, uri="/test-updated", method="GET"), 404, "Unwanted success"
+        )
 
         # Update the service property
         servlet.change("/test-updated")
@@ -466,8 +491,12 @@ class BasicHTTPServiceServletsTest(unittest.TestCase):
         )
 
         # Test access to /test-updated
-        self.assertEqual(get_http_code(uri="/test-updated", method="GET"), 200, "Servlet not registered ?")
-        self.assertEqual(get_http_code(uri="/test", method="GET"), 404, "Unwanted answer after update")
+        self.assertEqual(
+            get_http_code(port=self.port, uri="/test-updated", method="GET"), 200, "Servlet not registered ?"
+        )
+        self.assertEqual(
+            get_http_code(port=self.port, uri="/test", method="GET"), 404, "Unwanted answer after update"
+        )
 
         # Kill the component
         self.ipopo.kill(servlet_name)
@@ -478,7 +507,9 @@ class BasicHTTPServiceServletsTest(unittest.TestCase):
         servlet.reset()
 
         # Test access to /test-updated
-        self.assertEqual(get_http_code(uri="/test-updated", method="GET"), 404, "Servlet still registered")
+        self.assertEqual(
+            get_http_code(port=self.port, uri="/test-updated", method="GET"), 404, "Servlet still registered"
+        )
 
 
 # ------------------------------------------------------------------------------
@@ -491,32 +522,44 @@ class BasicHTTPServiceMethodsTest(unittest.TestCase):
 
     framework: Framework
     ipopo: IPopoService
+    port: int
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpClass(cls) -> None:
         """
-        Sets up the test environment
+        Starts the framework shared by all tests
         """
         # Start a framework
-        self.framework = FrameworkFactory.get_framework()
-        self.framework.start()
+        cls.framework = FrameworkFactory.get_framework()
+        cls.framework.start()
 
         # Install iPOPO
-        self.ipopo = install_ipopo(self.framework)
+        cls.ipopo = install_ipopo(cls.framework)
 
         # Install HTTP service
-        install_bundle(self.framework, "pelix.http.basic")
-        self.http_svc = instantiate_server(self.ipopo)
+        install_bundle(cls.framework, "pelix.http.basic")
 
-        # Install test bundle
-        self.servlets = install_bundle(self.framework, "tests.http.servlets_bundle")
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Stops the shared framework
+        """
+        FrameworkFactory.delete_framework()
+        cls.framework = None  # type: ignore
+
+    def setUp(self) -> None:
+        """
+        Sets up the test environment
+        """
+        self.http_svc, self.port = start_server(self.ipopo)
 
     def tearDown(self) -> None:
         """
         Cleans up the test environment
         """
-        # Stop the framework
-        FrameworkFactory.delete_framework()
-        self.framework = None  # type: ignore
+        # Kill the server (it might have been restarted by the test)
+        if self.ipopo.is_registered_instance("test-http-service"):
+            kill_server(self.ipopo)
 
     def testGetServerInfo(self) -> None:
         """
@@ -524,16 +567,18 @@ class BasicHTTPServiceMethodsTest(unittest.TestCase):
         """
         # Given a valid address
         address = "127.0.0.1"
-        port = 8090
 
         kill_server(self.ipopo)
-        http_svc = instantiate_server(self.ipopo, address, port)
+        http_svc = instantiate_server(self.ipopo, address, 0)
 
         import socket
 
         self.assertEqual(http_svc.get_hostname(), socket.gethostname(), "Different host names found")
 
-        self.assertEqual(http_svc.get_access(), (address, port), "Different accesses found")
+        # Keep the port picked by the system, to reuse it
+        access_address, port = http_svc.get_access()
+        self.assertEqual(access_address, address, "Different addresses found")
+        self.assertNotEqual(port, 0, "Port not bound")
 
         # Given no address -> must be in a standard localhost representation
         # (depends on test system)
@@ -565,8 +610,8 @@ class BasicHTTPServiceMethodsTest(unittest.TestCase):
         self.assertIsNone(self.http_svc.get_servlet("/"), "Empty servlet service may return None")
 
         # Dummy objects
-        servlet_1 = cast(http.Servlet, object())
-        servlet_2 = cast(http.Servlet, object())
+        servlet_1 = DUMMY_SERVLET_1
+        servlet_2 = DUMMY_SERVLET_2
 
         # Register'em
         path_1 = "/test"
@@ -577,28 +622,49 @@ class BasicHTTPServiceMethodsTest(unittest.TestCase):
 
         # Test the get_servlet method
         for path in ("/test", "/test/", "/test/1"):
-            self.assertIs(
-                ensure_get_servlet(self.http_svc, path)[0],
-                servlet_1,
-                "Servlet 1 should handle {0}".format(path),
-            )
-            self.assertEqual(ensure_get_servlet(self.http_svc, path)[2], path_1, "Servlet 1 path is not kept")
+            servlet, _, prefix = ensure_get_servlet(self.http_svc, path)
+            self.assertIs(servlet, servlet_1, "Servlet 1 should handle {0}".format(path))
+            self.assertEqual(prefix, path_1, "Servlet 1 path is not kept")
 
         for path in ("/test/sub", "/test/sub/", "/test/sub/1"):
-            self.assertIs(
-                ensure_get_servlet(self.http_svc, path)[0],
-                servlet_2,
-                "Servlet 2 should handle {0}".format(path),
-            )
-            self.assertEqual(ensure_get_servlet(self.http_svc, path)[2], path_2, "Servlet 2 path is not kept")
+            servlet, _, prefix = ensure_get_servlet(self.http_svc, path)
+            self.assertIs(servlet, servlet_2, "Servlet 2 should handle {0}".format(path))
+            self.assertEqual(prefix, path_2, "Servlet 2 path is not kept")
+
+    def testGetServletCache(self) -> None:
+        """
+        Tests the update of get_servlet() results on registration changes
+        """
+        # Dummy objects
+        servlet_1 = DUMMY_SERVLET_1
+        servlet_2 = DUMMY_SERVLET_2
+
+        # Unknown path
+        self.assertIsNone(self.http_svc.get_servlet("/test/sub/1"))
+
+        # Parent path registered
+        self.assertTrue(self.http_svc.register_servlet("/test", servlet_1))
+        self.assertIs(ensure_get_servlet(self.http_svc, "/test/sub/1")[0], servlet_1)
+
+        # Deeper path registered
+        self.assertTrue(self.http_svc.register_servlet("/test/sub", servlet_2))
+        self.assertIs(ensure_get_servlet(self.http_svc, "/test/sub/1")[0], servlet_2)
+
+        # Deeper path unregistered
+        self.assertTrue(self.http_svc.unregister("/test/sub"))
+        self.assertIs(ensure_get_servlet(self.http_svc, "/test/sub/1")[0], servlet_1)
+
+        # Parent path unregistered
+        self.assertTrue(self.http_svc.unregister("/test"))
+        self.assertIsNone(self.http_svc.get_servlet("/test/sub/1"))
 
     def testRegisterServlet(self) -> None:
         """
         Tests the behavior of register_servlet with dummy objects
         """
         # Dummy objects
-        servlet_1 = cast(http.Servlet, object())
-        servlet_2 = cast(http.Servlet, object())
+        servlet_1 = DUMMY_SERVLET_1
+        servlet_2 = DUMMY_SERVLET_2
 
         # Refuse None servlets
         self.assertRaises(ValueError, self.http_svc.register_servlet, "/test", None)
@@ -621,7 +687,7 @@ class BasicHTTPServiceMethodsTest(unittest.TestCase):
         Tests the behavior of register_servlet with dummy objects
         """
         # Dummy object
-        servlet_1 = cast(http.Servlet, object())
+        servlet_1 = DUMMY_SERVLET_1
 
         self.http_svc.register_servlet("/test", servlet_1)
 
@@ -636,7 +702,7 @@ class BasicHTTPServiceMethodsTest(unittest.TestCase):
 
         # Try to unregister an unknown servlet
         self.assertFalse(
-            self.http_svc.unregister(None, cast(http.Servlet, object())),
+            self.http_svc.unregister(None, DUMMY_SERVLET_2),
             "An unknown servlet can't be unregistered.",
         )
 
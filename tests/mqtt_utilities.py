@@ -20,6 +20,7 @@ Utility methods for MQTT tests
     limitations under the License.
 """
 
+import functools
 import unittest
 from threading import Event
 from typing import Optional
@@ -36,9 +37,11 @@ __docformat__ = "restructuredtext en"
 # ------------------------------------------------------------------------------
 
 
+@functools.lru_cache(maxsize=1)
 def find_mqtt_server() -> Optional[str]:
     """
-    Looks for a working server to run the tests
+    Looks for a working server to run the tests.
+    The result is kept for the whole test session.
 
     :return: The host name of a working MQTT server, else None
     """
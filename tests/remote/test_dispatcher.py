@@ -8,13 +8,21 @@ Tests the Remote Services Exports Dispatcher
 
 import unittest
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import pelix.constants
 import pelix.framework
 import pelix.remote
 import pelix.remote.beans as beans
-from pelix.internals.registry import ServiceReference
+from pelix.remote import (
+    PROP_EXPORT_NONE,
+    PROP_EXPORT_ONLY,
+    PROP_EXPORT_REJECT,
+    PROP_EXPORTED_INTERFACES,
+    SERVICE_EXPORT_ENDPOINT_LISTENER,
+    SERVICE_EXPORT_PROVIDER,
+)
+from pelix.internals.registry import ServiceReference, ServiceRegistration
 
 # ------------------------------------------------------------------------------
 
@@ -25,6 +33,17 @@ ADDED = 1
 UPDATED = 2
 REMOVED = 3
 
+# Specifications of the exported services
+SPEC_1 = "sample.spec.1"
+SPEC_2 = "sample.spec.2"
+SPEC_3 = "sample.spec.3"
+
+# Specifications as given in endpoints
+FULL_SPEC_1 = "python:/" + SPEC_1
+FULL_SPEC_2 = "python:/" + SPEC_2
+FULL_SPEC_3 = "python:/" + SPEC_3
+PYTHON_SPECS = {SPEC_1: FULL_SPEC_1, SPEC_2: FULL_SPEC_2, SPEC_3: FULL_SPEC_3}
+
 # ------------------------------------------------------------------------------
 
 
@@ -54,7 +73,7 @@ class Exporter:
         """
         Clears the listener state
         """
-        del self.events[:]
+        self.events.clear()
 
     def export_service(self, svc_ref: ServiceReference[Any], name: str, fw_uid: str) -> beans.ExportEndpoint:
         """
@@ -100,7 +119,7 @@ class Listener:
         """
         Clears the listener state
         """
-        del self.events[:]
+        self.events.clear()
 
     def endpoints_added(self, endpoints: List[beans.ExportEndpoint]) -> None:
         """
@@ -139,47 +158,82 @@ class DispatcherTest(unittest.TestCase):
 
     framework: pelix.framework.Framework
     service: pelix.remote.RemoteServiceDispatcher
+    context: pelix.framework.BundleContext
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpClass(cls) -> None:
         """
-        Sets up the test
+        Starts the framework shared by all tests
         """
         # Create the framework
-        self.framework = pelix.framework.create_framework(["pelix.ipopo.core"])
-        self.framework.start()
+        cls.framework = pelix.framework.create_framework(["pelix.ipopo.core"])
+        cls.framework.start()
 
         # Install the registry
-        context = self.framework.get_bundle_context()
+        context = cls.context = cls.framework.get_bundle_context()
         context.install_bundle("pelix.remote.dispatcher").start()
 
         # Get the framework UID
-        self.framework_uid = context.get_property(pelix.constants.FRAMEWORK_UID)
+        cls.framework_uid = context.get_property(pelix.constants.FRAMEWORK_UID)
 
         # Get the service
         svc_ref = context.get_service_reference(pelix.remote.RemoteServiceDispatcher)
         assert svc_ref is not None
-        self.service = context.get_service(svc_ref)
+        cls.service = context.get_service(svc_ref)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Stops the shared framework
+        """
+        pelix.framework.FrameworkFactory.delete_framework()
+
+        cls.framework = None  # type: ignore
+        cls.service = None  # type: ignore
+        cls.context = None  # type: ignore
+
+    def setUp(self) -> None:
+        """
+        Sets up the test
+        """
+        # Services registered by the test
+        self._registrations: List[ServiceRegistration[Any]] = []
+
+        # Fail fast if a previous test left an endpoint
+        self.assertEqual(self.service.get_endpoints(), [], "Endpoints left by a previous test")
 
     def tearDown(self) -> None:
         """
         Cleans up for next test
         """
-        # Stop the framework
-        pelix.framework.FrameworkFactory.delete_framework()
+        # Unregister the services registered by the test
+        for svc_reg in self._registrations:
+            try:
+                svc_reg.unregister()
+            except pelix.constants.BundleException:
+                # Already unregistered by the test
+                pass
 
-        self.framework = None  # type: ignore
-        self.service = None  # type: ignore
+    def _register_service(self, spec: str, service: Any, props: Dict[str, Any]) -> ServiceRegistration[Any]:
+        """
+        Registers a service, which will be unregistered after the test
+
+        :param spec: Service specification
+        :param service: Service instance
+        :param props: Service properties
+        :return: The service registration
+        """
+        svc_reg = self.context.register_service(spec, service, props)
+        self._registrations.append(svc_reg)
+        return svc_reg
 
     def testEmpty(self) -> None:
         """
         Tests the behavior of the dispatcher without listener
         """
         # Register an exported service
-        context = self.framework.get_bundle_context()
         service = object()
-        svc_reg = context.register_service(
-            "sample.spec", service, {pelix.remote.PROP_EXPORTED_INTERFACES: "*"}
-        )
+        svc_reg = self._register_service("sample.spec", service, {PROP_EXPORTED_INTERFACES: "*"})
 
         # Look for the endpoint
         self.assertEqual(self.service.get_endpoints(), [], "An endpoint has been created")
@@ -187,148 +241,88 @@ class DispatcherTest(unittest.TestCase):
         # Unregister the service
         svc_reg.unregister()
 
-    def testExporterAfterRegistration(self) -> None:
+    def _check_exporter(self, register_exporter_first: bool, raise_exception: bool) -> None:
         """
-        Tests the behavior of the dispatcher with a exporter
+        Checks the notifications of an exporter
+
+        :param register_exporter_first: If True, register the exporter before the exported service
+        :param raise_exception: If True, the exporter refuses the update of the service
         """
-        # Register an exported service
-        context = self.framework.get_bundle_context()
+        context = self.context
         service = object()
 
-        for raise_exception in (False, True):
-            # Register the exported service
-            svc_reg = context.register_service(
-                "sample.spec", service, {pelix.remote.PROP_EXPORTED_INTERFACES: "*"}
-            )
-
-            # Prepare a exporter
-            exporter = Exporter(context)
-            exporter.raise_exception = raise_exception
-
-            # Register it
-            exporter_reg = context.register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
-
-            # Check the state of the exporter
-            self.assertListEqual(exporter.events, [ADDED], "Exporter not notified")
-            exporter.clear()
-
-            # Look for the endpoint
-            endpoints = self.service.get_endpoints()
-            self.assertEqual(len(endpoints), 1, "The endpoint has not been created")
-            endpoint = endpoints[0]
-            self.assertIs(endpoint.instance, service)
-
-            # Check access
-            self.assertIs(
-                self.service.get_endpoint(endpoint.uid), endpoint, "Different endpoint on UID access"
-            )
-
-            # Update the service
-            svc_reg.set_properties({"some": "property"})
-            if raise_exception:
-                # The new properties have been refused
-                self.assertListEqual(
-                    exporter.events, [UPDATED, REMOVED], "Exporter not notified of name removal"
-                )
-
-            else:
-                # Check the state of the exporter
-                self.assertListEqual(exporter.events, [UPDATED], "Exporter not notified of update")
-            exporter.clear()
-
-            # Unregister the exported service
-            svc_reg.unregister()
-
-            if raise_exception:
-                # Exception raised: the exporter has not been notified
-                self.assertListEqual(exporter.events, [], "Exporter notified of ignored removal")
+        # Prepare a exporter
+        exporter = Exporter(context)
+        exporter.raise_exception = raise_exception
 
-            else:
-                # Check the state of the exporter
-                self.assertListEqual(exporter.events, [REMOVED], "Exporter not notified of removal")
-            exporter.clear()
+        if register_exporter_first:
+            exporter_reg = self._register_service(SERVICE_EXPORT_PROVIDER, exporter, {})
+            svc_reg = self._register_service("sample.spec", service, {PROP_EXPORTED_INTERFACES: "*"})
+        else:
+            svc_reg = self._register_service("sample.spec", service, {PROP_EXPORTED_INTERFACES: "*"})
+            exporter_reg = self._register_service(SERVICE_EXPORT_PROVIDER, exporter, {})
 
-            # Ensure there is no more endpoint
-            self.assertEqual(self.service.get_endpoints(), [], "Endpoint still there")
-            self.assertIsNone(self.service.get_endpoint(endpoint.uid), "Endpoint still there")
+        # Check the state of the exporter
+        self.assertListEqual(exporter.events, [ADDED], "Exporter not notified")
+        exporter.clear()
 
-            # Unregister the service
-            exporter_reg.unregister()
-
-    def testExporterBeforeRegistration(self) -> None:
-        """
-        Tests the behavior of the dispatcher with a exporter
-        """
-        # Register an exported service
-        context = self.framework.get_bundle_context()
-        service = object()
-
-        for raise_exception in (False, True):
-            # Prepare a exporter
-            exporter = Exporter(context)
-            exporter.raise_exception = raise_exception
+        # Look for the endpoint
+        endpoints = self.service.get_endpoints()
+        self.assertEqual(len(endpoints), 1, "The endpoint has not been created")
+        endpoint = endpoints[0]
+        self.assertIs(endpoint.instance, service)
 
-            # Register it
-            exporter_reg = context.register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
+        # Check access
+        self.assertIs(self.service.get_endpoint(endpoint.uid), endpoint, "Different endpoint on UID access")
 
-            # Register the exported service
-            svc_reg = context.register_service(
-                "sample.spec", service, {pelix.remote.PROP_EXPORTED_INTERFACES: "*"}
-            )
+        # Update the service
+        svc_reg.set_properties({"some": "property"})
+        if raise_exception:
+            # The new properties have been refused
+            self.assertListEqual(exporter.events, [UPDATED, REMOVED], "Exporter not notified of name removal")
 
+        else:
             # Check the state of the exporter
-            self.assertListEqual(exporter.events, [ADDED], "Exporter not notified")
-            exporter.clear()
-
-            # Look for the endpoint
-            endpoints = self.service.get_endpoints()
-            self.assertEqual(len(endpoints), 1, "The endpoint has not been created")
-            endpoint = endpoints[0]
-            self.assertIs(endpoint.instance, service)
-
-            # Check access
-            self.assertIs(
-                self.service.get_endpoint(endpoint.uid), endpoint, "Different endpoint on UID access"
-            )
+            self.assertListEqual(exporter.events, [UPDATED], "Exporter not notified of update")
+        exporter.clear()
 
-            # Update the service
-            svc_reg.set_properties({"some": "property"})
-            if raise_exception:
-                # The new properties have been refused
-                self.assertListEqual(
-                    exporter.events, [UPDATED, REMOVED], "Exporter not notified of name removal"
-                )
+        # Unregister the exported service
+        svc_reg.unregister()
 
-            else:
-                # Check the state of the exporter
-                self.assertListEqual(exporter.events, [UPDATED], "Exporter not notified of update")
-            exporter.clear()
+        if raise_exception:
+            # Exception raised: the exporter has not been notified
+            self.assertListEqual(exporter.events, [], "Exporter notified of ignored removal")
 
-            # Unregister the exported service
-            svc_reg.unregister()
-
-            if raise_exception:
-                # Exception raised: the exporter has not been notified
-                self.assertListEqual(exporter.events, [], "Exporter notified of ignored removal")
+        else:
+            # Check the state of the exporter
+            self.assertListEqual(exporter.events, [REMOVED], "Exporter not notified of removal")
+        exporter.clear()
 
-            else:
-                # Check the state of the exporter
-                self.assertListEqual(exporter.events, [REMOVED], "Exporter not notified of removal")
-            exporter.clear()
+        # Ensure there is no more endpoint
+        self.assertEqual(self.service.get_endpoints(), [], "Endpoint still there")
+        self.assertIsNone(self.service.get_endpoint(endpoint.uid), "Endpoint still there")
 
-            # Ensure there is no more endpoint
-            self.assertEqual(self.service.get_endpoints(), [], "Endpoint still there")
-            self.assertIsNone(self.service.get_endpoint(endpoint.uid), "Endpoint still there")
+        # Unregister the service
+        exporter_reg.unregister()
 
-            # Unregister the service
-            exporter_reg.unregister()
+    def testExporter(self) -> None:
+        """
+        Tests the behavior of the dispatcher with a exporter, registered
+        before or after the exported service
+        """
+        for register_exporter_first in (False, True):
+            for raise_exception in (False, True):
+                with self.subTest(
+                    register_exporter_first=register_exporter_first, raise_exception=raise_exception
+                ):
+                    self._check_exporter(register_exporter_first, raise_exception)
 
     def testListenerBefore(self) -> None:
         """
         Tests the notification of endpoint listeners
         """
         # Register an exported service
-        context = self.framework.get_bundle_context()
+        context = self.context
         service = object()
 
         for name_error in (True, False):
@@ -336,14 +330,10 @@ class DispatcherTest(unittest.TestCase):
                 # Prepare a listener
                 listener = Listener()
                 listener.raise_exception = raise_exception
-                listener_reg = context.register_service(
-                    pelix.remote.SERVICE_EXPORT_ENDPOINT_LISTENER, listener, {}
-                )
+                listener_reg = self._register_service(SERVICE_EXPORT_ENDPOINT_LISTENER, listener, {})
 
                 # Register the exported service
-                svc_reg = context.register_service(
-                    "sample.spec", service, {pelix.remote.PROP_EXPORTED_INTERFACES: "*"}
-                )
+                svc_reg = self._register_service("sample.spec", service, {PROP_EXPORTED_INTERFACES: "*"})
 
                 # Check the state of the listener
                 self.assertListEqual(listener.events, [], "Listener notified too soon")
@@ -352,7 +342,7 @@ class DispatcherTest(unittest.TestCase):
                 # Prepare a exporter
                 exporter = Exporter(context)
                 exporter.raise_exception = name_error
-                exporter_reg = context.register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
+                exporter_reg = self._register_service(SERVICE_EXPORT_PROVIDER, exporter, {})
 
                 # Check the state of the listener
                 self.assertListEqual(listener.events, [ADDED], "Listener not notified")
@@ -390,25 +380,21 @@ class DispatcherTest(unittest.TestCase):
         Tests the notification of endpoint listeners
         """
         # Prepare an exported service
-        context = self.framework.get_bundle_context()
+        context = self.context
         service = object()
 
         for raise_exception in (False, True):
             # Prepare a exporter
             exporter = Exporter(context)
-            exporter_reg = context.register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
+            exporter_reg = self._register_service(SERVICE_EXPORT_PROVIDER, exporter, {})
 
             # Register the exported service
-            svc_reg = context.register_service(
-                "sample.spec", service, {pelix.remote.PROP_EXPORTED_INTERFACES: "*"}
-            )
+            svc_reg = self._register_service("sample.spec", service, {PROP_EXPORTED_INTERFACES: "*"})
 
             # Prepare a listener
             listener = Listener()
             listener.raise_exception = raise_exception
-            listener_reg = context.register_service(
-                pelix.remote.SERVICE_EXPORT_ENDPOINT_LISTENER, listener, {}
-            )
+            listener_reg = self._register_service(SERVICE_EXPORT_ENDPOINT_LISTENER, listener, {})
 
             # Check the state of the listener
             self.assertListEqual(listener.events, [ADDED], "Listener not notified")
@@ -435,20 +421,18 @@ class DispatcherTest(unittest.TestCase):
         """
         Tests the behavior of the get_endpoints() method
         """
-        context = self.framework.get_bundle_context()
+        context = self.context
 
         # Register exporters
         exporterA = Exporter(context, "nameA", ["configA"])
-        exporterA_reg = context.register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporterA, {})
+        exporterA_reg = self._register_service(SERVICE_EXPORT_PROVIDER, exporterA, {})
 
         exporterB = Exporter(context, "nameB", ["configB"])
-        exporterB_reg = context.register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporterB, {})
+        exporterB_reg = self._register_service(SERVICE_EXPORT_PROVIDER, exporterB, {})
 
         # Register the remote service
         service = object()
-        svc_reg = context.register_service(
-            "sample.spec", service, {pelix.remote.PROP_EXPORTED_INTERFACES: "*"}
-        )
+        svc_reg = self._register_service("sample.spec", service, {PROP_EXPORTED_INTERFACES: "*"})
 
         # Get all endpoints
         self.assertCountEqual(
@@ -514,54 +498,51 @@ class DispatcherTest(unittest.TestCase):
         """
         Tests the "pelix.remote.export.reject" property
         """
-        spec_1 = "sample.spec.1"
-        full_spec_1 = "python:/" + spec_1
-        spec_2 = "sample.spec.2"
-        full_spec_2 = "python:/" + spec_2
-        spec_3 = "sample.spec.3"
-        full_spec_3 = "python:/" + spec_3
-
         # Register an exporter
-        context = self.framework.get_bundle_context()
+        context = self.context
         exporter = Exporter(context)
-        context.register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
+        self._register_service(SERVICE_EXPORT_PROVIDER, exporter, {})
 
         # Register an exported service: No filter
         service = object()
-        svc_reg = context.register_service(
-            [spec_1, spec_2, spec_3],
+        svc_reg = self._register_service(
+            [SPEC_1, SPEC_2, SPEC_3],
             service,
-            {pelix.remote.PROP_EXPORTED_INTERFACES: "*", pelix.remote.PROP_EXPORT_REJECT: None},
+            {PROP_EXPORTED_INTERFACES: "*", PROP_EXPORT_REJECT: None},
         )
 
         # Look for the endpoint: all services must be exported
         endpoint = self.service.get_endpoints()[0]
-        self.assertCountEqual([full_spec_1, full_spec_2, full_spec_3], endpoint.specifications)
+        self.assertCountEqual([FULL_SPEC_1, FULL_SPEC_2, FULL_SPEC_3], endpoint.specifications)
         svc_reg.unregister()
 
         # Check with a string
-        svc_reg = context.register_service(
-            [spec_1, spec_2, spec_3],
+        svc_reg = self._register_service(
+            [SPEC_1, SPEC_2, SPEC_3],
             service,
-            {pelix.remote.PROP_EXPORTED_INTERFACES: "*", pelix.remote.PROP_EXPORT_REJECT: spec_1},
+            {PROP_EXPORTED_INTERFACES: "*", PROP_EXPORT_REJECT: SPEC_1},
         )
 
         # Look for the endpoint: all services must be exported
         endpoint = self.service.get_endpoints()[0]
-        self.assertCountEqual([full_spec_2, full_spec_3], endpoint.specifications)
+        self.assertCountEqual([FULL_SPEC_2, FULL_SPEC_3], endpoint.specifications)
         svc_reg.unregister()
 
-        for reject in ([spec_1], [spec_1, spec_2]):
+        # (rejected, exported) specifications
+        all_specs = frozenset((SPEC_1, SPEC_2, SPEC_3))
+        cases = [
+            (reject, [PYTHON_SPECS[spec] for spec in all_specs.difference(reject)])
+            for reject in ([SPEC_1], [SPEC_1, SPEC_2])
+        ]
+
+        for reject, exported in cases:
             # Register the service
-            svc_reg = context.register_service(
-                [spec_1, spec_2, spec_3],
+            svc_reg = self._register_service(
+                [SPEC_1, SPEC_2, SPEC_3],
                 service,
-                {pelix.remote.PROP_EXPORTED_INTERFACES: "*", pelix.remote.PROP_EXPORT_REJECT: reject},
+                {PROP_EXPORTED_INTERFACES: "*", PROP_EXPORT_REJECT: reject},
             )
 
-            # Compute exported interfaces
-            exported = ["python:/" + spec for spec in {spec_1, spec_2, spec_3}.difference(reject)]
-
             # Check it
             endpoint = self.service.get_endpoints()[0]
             self.assertCountEqual(exported, endpoint.specifications)
@@ -570,12 +551,12 @@ class DispatcherTest(unittest.TestCase):
             svc_reg.unregister()
 
         # Reject everything
-        svc_reg = context.register_service(
-            [spec_1, spec_2, spec_3],
+        svc_reg = self._register_service(
+            [SPEC_1, SPEC_2, SPEC_3],
             service,
             {
-                pelix.remote.PROP_EXPORTED_INTERFACES: "*",
-                pelix.remote.PROP_EXPORT_REJECT: [spec_1, spec_2, spec_3],
+                PROP_EXPORTED_INTERFACES: "*",
+                PROP_EXPORT_REJECT: [SPEC_1, SPEC_2, SPEC_3],
             },
         )
         self.assertListEqual([], self.service.get_endpoints(), "Endpoint registered while it exports nothing")
@@ -585,53 +566,51 @@ class DispatcherTest(unittest.TestCase):
         """
         Tests the "pelix.remote.export.only" property
         """
-        spec_1 = "sample.spec.1"
-        full_spec_1 = "python:/" + spec_1
-        spec_2 = "sample.spec.2"
-        full_spec_2 = "python:/" + spec_2
-        spec_3 = "sample.spec.3"
-        full_spec_3 = "python:/" + spec_3
-
         # Register an exporter
-        context = self.framework.get_bundle_context()
+        context = self.context
         exporter = Exporter(context)
-        context.register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
+        self._register_service(SERVICE_EXPORT_PROVIDER, exporter, {})
 
         # Register an exported service: No filter
         service = object()
-        svc_reg = context.register_service(
-            [spec_1, spec_2, spec_3],
+        svc_reg = self._register_service(
+            [SPEC_1, SPEC_2, SPEC_3],
             service,
-            {pelix.remote.PROP_EXPORTED_INTERFACES: "*", pelix.remote.PROP_EXPORT_ONLY: None},
+            {PROP_EXPORTED_INTERFACES: "*", PROP_EXPORT_ONLY: None},
         )
 
         # Look for the endpoint: all services must be exported
         endpoint = self.service.get_endpoints()[0]
-        self.assertCountEqual([full_spec_1, full_spec_2, full_spec_3], endpoint.specifications)
+        self.assertCountEqual([FULL_SPEC_1, FULL_SPEC_2, FULL_SPEC_3], endpoint.specifications)
         svc_reg.unregister()
 
         # Check with a string
-        svc_reg = context.register_service(
-            [spec_1, spec_2, spec_3],
+        svc_reg = self._register_service(
+            [SPEC_1, SPEC_2, SPEC_3],
             service,
-            {pelix.remote.PROP_EXPORTED_INTERFACES: "*", pelix.remote.PROP_EXPORT_ONLY: spec_1},
+            {PROP_EXPORTED_INTERFACES: "*", PROP_EXPORT_ONLY: SPEC_1},
         )
 
         # Look for the endpoint: all services must be exported
         endpoint = self.service.get_endpoints()[0]
-        self.assertCountEqual([full_spec_1], endpoint.specifications)
+        self.assertCountEqual([FULL_SPEC_1], endpoint.specifications)
         svc_reg.unregister()
 
-        for export_only in ([spec_1], [spec_1, spec_2]):
+        # (exported only, exported) specifications
+        cases = [
+            (export_only, [PYTHON_SPECS[spec] for spec in export_only])
+            for export_only in ([SPEC_1], [SPEC_1, SPEC_2])
+        ]
+
+        for export_only, exported in cases:
             # Register the service
-            svc_reg = context.register_service(
-                [spec_1, spec_2, spec_3],
+            svc_reg = self._register_service(
+                [SPEC_1, SPEC_2, SPEC_3],
                 service,
-                {pelix.remote.PROP_EXPORTED_INTERFACES: "*", pelix.remote.PROP_EXPORT_ONLY: export_only},
+                {PROP_EXPORTED_INTERFACES: "*", PROP_EXPORT_ONLY: export_only},
             )
 
             # Check it
-            exported = ["python:/" + spec for spec in export_only]
             endpoint = self.service.get_endpoints()[0]
             self.assertCountEqual(exported, endpoint.specifications)
 
@@ -639,18 +618,18 @@ class DispatcherTest(unittest.TestCase):
             svc_reg.unregister()
 
         # The reject property must be ignored
-        svc_reg = context.register_service(
-            [spec_1, spec_2, spec_3],
+        svc_reg = self._register_service(
+            [SPEC_1, SPEC_2, SPEC_3],
             service,
             {
-                pelix.remote.PROP_EXPORTED_INTERFACES: "*",
-                pelix.remote.PROP_EXPORT_ONLY: [spec_1, spec_2, spec_3],
-                pelix.remote.PROP_EXPORT_REJECT: [spec_1, spec_2],
+                PROP_EXPORTED_INTERFACES: "*",
+                PROP_EXPORT_ONLY: [SPEC_1, SPEC_2, SPEC_3],
+                PROP_EXPORT_REJECT: [SPEC_1, SPEC_2],
             },
         )
         endpoint = self.service.get_endpoints()[0]
         self.assertCountEqual(
-            [full_spec_1, full_spec_2, full_spec_3],
+            [FULL_SPEC_1, FULL_SPEC_2, FULL_SPEC_3],
             endpoint.specifications,
             "Some specifications were rejected",
         )
@@ -660,75 +639,42 @@ class DispatcherTest(unittest.TestCase):
         """
         Tests the "pelix.remote.export.reject" property
         """
-        spec_1 = "sample.spec.1"
-        full_spec_1 = "python:/" + spec_1
-        spec_2 = "sample.spec.2"
-        full_spec_2 = "python:/" + spec_2
-        spec_3 = "sample.spec.3"
-        full_spec_3 = "python:/" + spec_3
-
         # Register an exporter
-        context = self.framework.get_bundle_context()
+        context = self.context
         exporter = Exporter(context)
-        context.register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
+        self._register_service(SERVICE_EXPORT_PROVIDER, exporter, {})
 
         # Prepare the service
         service = object()
 
-        # Check with false values
-        for value in ("", 0, False, None):
-            svc_reg = context.register_service(
-                [spec_1, spec_2, spec_3],
-                service,
-                {pelix.remote.PROP_EXPORTED_INTERFACES: "*", pelix.remote.PROP_EXPORT_NONE: value},
-            )
-
-            # Look for the endpoint: all services must be exported
-            endpoint = self.service.get_endpoints()[0]
-            self.assertCountEqual([full_spec_1, full_spec_2, full_spec_3], endpoint.specifications)
-            svc_reg.unregister()
-
-        # Check with true values
-        for value in ("*", "true", "false", 1, True):
-            svc_reg = context.register_service(
-                [spec_1, spec_2, spec_3],
-                service,
-                {pelix.remote.PROP_EXPORTED_INTERFACES: "*", pelix.remote.PROP_EXPORT_NONE: value},
-            )
-
-            # Look for the endpoint: all services must be exported
-            self.assertListEqual(
-                [], self.service.get_endpoints(), "Service exported even with export.none={0}".format(value)
-            )
-            svc_reg.unregister()
-
-        # Check with reject
-        svc_reg = context.register_service(
-            [spec_1, spec_2, spec_3],
-            service,
-            {
-                pelix.remote.PROP_EXPORTED_INTERFACES: "*",
-                pelix.remote.PROP_EXPORT_NONE: True,
-                pelix.remote.PROP_EXPORT_REJECT: [spec_3],
-            },
-        )
-        self.assertListEqual(
-            [], self.service.get_endpoints(), "export.reject worked while export.none was set"
-        )
-        svc_reg.unregister()
+        # (export.none value, other properties, service must be exported)
+        cases: List[Tuple[Any, Dict[str, Any], bool]] = [(value, {}, True) for value in ("", 0, False, None)]
+        cases.extend((value, {}, False) for value in ("*", "true", "false", 1, True))
+        cases.append((True, {PROP_EXPORT_REJECT: [SPEC_3]}, False))
+        cases.append((True, {PROP_EXPORT_ONLY: [SPEC_1, SPEC_2, SPEC_3]}, False))
+
+        for value, extra_props, exported in cases:
+            with self.subTest(value=value, extra_props=extra_props):
+                svc_reg = self._register_service(
+                    [SPEC_1, SPEC_2, SPEC_3],
+                    service,
+                    {PROP_EXPORTED_INTERFACES: "*", PROP_EXPORT_NONE: value, **extra_props},
+                )
 
-        # Check with only
-        svc_reg = context.register_service(
-            [spec_1, spec_2, spec_3],
-            service,
-            {
-                pelix.remote.PROP_EXPORTED_INTERFACES: "*",
-                pelix.remote.PROP_EXPORT_NONE: True,
-                pelix.remote.PROP_EXPORT_ONLY: [spec_1, spec_2, spec_3],
-            },
-        )
-        self.assertListEqual([], self.service.get_endpoints(), "export.only worked while export.none was set")
-        svc_reg.unregister()
+                try:
+                    endpoints = self.service.get_endpoints()
+                    if exported:
+                        # All services must be exported
+                        self.assertEqual(len(endpoints), 1, "Service not exported")
+                        self.assertCountEqual(
+                            [FULL_SPEC_1, FULL_SPEC_2, FULL_SPEC_3], endpoints[0].specifications
+                        )
+                    else:
+                        self.assertListEqual(
+                            [], endpoints, "Service exported even with export.none={0}".format(value)
+                        )
+                finally:
+                    svc_reg.unregister()
 
 
 # ------------------------------------------------------------------------------
@@ -7,34 +7,50 @@ Tests the Remote Services Exports Dispatcher
 """
 
 import http.client as httplib
+import itertools
 import json
 import unittest
-import uuid
 from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urljoin
 
 import pelix.constants
 import pelix.framework
+import pelix.http
 import pelix.remote
 import pelix.remote.beans as beans
 from pelix.http import AbstractHTTPServletRequest, AbstractHTTPServletResponse
-from pelix.internals.registry import ServiceReference
+from pelix.internals.registry import ServiceReference, ServiceRegistration
 from pelix.ipopo.constants import use_ipopo
-from pelix.utilities import to_str
+from pelix.utilities import to_str, use_service
 
 # ------------------------------------------------------------------------------
 
 __version_info__ = (1, 0, 2)
 __version__ = ".".join(str(x) for x in __version_info__)
 
+# Endpoint UIDs only have to be unique in the test session
+_ENDPOINT_IDS = itertools.count()
+
 # ------------------------------------------------------------------------------
 
 
+def _endpoint_summary(endpoint: beans.ExportEndpoint) -> Dict[str, str]:
+    """
+    Returns the entries the dispatcher servlet must give for an endpoint
+
+    :param endpoint: An export endpoint
+    :return: A dictionary of the expected JSON entries
+    """
+    return {"uid": endpoint.uid, "sender": endpoint.framework, "name": endpoint.name}
+
+
 class Exporter:
     """
     Service exporter
     """
 
+    __slots__ = ("context", "configs", "endpoints")
+
     def __init__(self, context: pelix.framework.BundleContext) -> None:
         """
         Sets up members
@@ -48,7 +64,9 @@ class Exporter:
         Endpoint registered
         """
         service = self.context.get_service(svc_ref)
-        endpoint = beans.ExportEndpoint(str(uuid.uuid4()), fw_uid, self.configs, name, svc_ref, service, {})
+        endpoint = beans.ExportEndpoint(
+            f"ep-{next(_ENDPOINT_IDS)}", fw_uid, self.configs, name, svc_ref, service, {}
+        )
         self.endpoints.append(endpoint)
         return endpoint
 
@@ -72,6 +90,8 @@ class ImportListener:
     Imports listener
     """
 
+    __slots__ = ("endpoints",)
+
     def __init__(self) -> None:
         """
         Sets up members
@@ -102,11 +122,13 @@ class FakeSerlvet:
     Fake servlet to grab POST data
     """
 
+    __slots__ = ("data", "error")
+
     def __init__(self) -> None:
         """
         Sets up members
         """
-        self.data: Optional[str] = None
+        self.data: Optional[bytes] = None
         self.error: bool = False
 
     def do_POST(self, request: AbstractHTTPServletRequest, response: AbstractHTTPServletResponse) -> None:
@@ -116,8 +138,8 @@ class FakeSerlvet:
         :param request: Request handler
         :param response: Response handler
         """
-        # Store data
-        self.data = to_str(request.read_data())
+        # Store raw data: json.loads() accepts bytes
+        self.data = request.read_data()
 
         # Respond
         if self.error:
@@ -135,20 +157,23 @@ class DispatcherTest(unittest.TestCase):
     """
 
     framework: pelix.framework.Framework
+    http: pelix.http.HTTPService
     servlet: pelix.remote.RemoteServiceDispatcherServlet
+    context: pelix.framework.BundleContext
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpClass(cls) -> None:
         """
-        Sets up the test
+        Starts the framework shared by all tests
         """
         # Create the framework
-        self.framework = pelix.framework.create_framework(
+        cls.framework = pelix.framework.create_framework(
             ("pelix.ipopo.core", "pelix.http.basic", "pelix.remote.dispatcher", "pelix.remote.registry")
         )
-        self.framework.start()
+        cls.framework.start()
 
         # Instantiate components
-        context = self.framework.get_bundle_context()
+        context = cls.context = cls.framework.get_bundle_context()
         with use_ipopo(context) as ipopo:
             # Instantiate remote service components
             # ... HTTP server
@@ -157,48 +182,110 @@ class DispatcherTest(unittest.TestCase):
             )
 
             # ... servlet giving access to the registry
-            self.servlet = ipopo.instantiate(
+            cls.servlet = ipopo.instantiate(
                 pelix.remote.FACTORY_REGISTRY_SERVLET, "pelix-remote-dispatcher-servlet"
             )
 
-        # Keep the HTTP server port
-        self.port = http.get_access()[1]
-        self.servlet_path = self.servlet.get_access()[1]
+        # Keep the HTTP server and its port
+        cls.http = http
+        cls.port = http.get_access()[1]
+        cls.servlet_path = cls.servlet.get_access()[1]
 
         # Get the framework UID
-        self.framework_uid = context.get_property(pelix.constants.FRAMEWORK_UID)
+        cls.framework_uid = context.get_property(pelix.constants.FRAMEWORK_UID)
 
         # Get the service
         svc_ref = context.get_service_reference(pelix.remote.RemoteServiceDispatcher)
         assert svc_ref is not None
-        self.dispatcher = context.get_service(svc_ref)
+        cls.dispatcher = context.get_service(svc_ref)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Stops the shared framework
+        """
+        pelix.framework.FrameworkFactory.delete_framework()
+
+        cls.framework = None  # type: ignore
+        cls.dispatcher = None  # type: ignore
+        cls.context = None  # type: ignore
+
+    def setUp(self) -> None:
+        """
+        Sets up the test
+        """
+        # Services registered by the test
+        self._registrations: List[ServiceRegistration[Any]] = []
 
     def tearDown(self) -> None:
         """
         Cleans up for next test
         """
-        # Stop the framework
-        pelix.framework.FrameworkFactory.delete_framework()
+        # Unregister the services registered by the test
+        for svc_reg in self._registrations:
+            try:
+                svc_reg.unregister()
+            except pelix.constants.BundleException:
+                # Already unregistered by the test
+                pass
 
-        self.framework = None  # type: ignore
-        self.dispatcher = None  # type: ignore
+    def _register_service(self, spec: str, service: Any, props: Dict[str, Any]) -> ServiceRegistration[Any]:
+        """
+        Registers a service, which will be unregistered after the test
 
-    def _http_get(self, path: str) -> Tuple[int, str]:
+        :param spec: Service specification
+        :param service: Service instance
+        :param props: Service properties
+        :return: The service registration
         """
-        Makes a HTTP GET request to the given path and returns the response
-        as a string
+        svc_reg = self.context.register_service(spec, service, props)
+        self._registrations.append(svc_reg)
+        return svc_reg
+
+    def _check_endpoints(self, exporter: Exporter) -> None:
+        """
+        Checks that the servlet lists the endpoints of the given exporter
+
+        :param exporter: The exporter providing the endpoints
+        """
+        status, response = self._http_get("/endpoints")
+        self.assertEqual(status, 200)
+
+        # Compare endpoints IDs
+        local_uids = sorted(endpoint.uid for endpoint in exporter.endpoints)
+        servlet_uids = sorted(item["uid"] for item in json.loads(response))
+        self.assertListEqual(servlet_uids, local_uids)
+
+    def _forget_framework(self, framework_uid: str) -> None:
+        """
+        Removes the endpoints imported from the given framework
+
+        :param framework_uid: UID of a remote framework
+        """
+        svc_ref = self.context.get_service_reference(pelix.remote.RemoteServiceRegistry)
+        assert svc_ref is not None
+        with use_service(self.context, svc_ref) as registry:
+            registry.lost_framework(framework_uid)
 
+    def _http_request(
+        self, method: str, path: str, body: Optional[str] = None, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, str]:
+        """
+        Makes a HTTP request to the given path and returns the response as a
+        string
+
+        :param method: HTTP method
         :param path: Sub path for the dispatcher servlet
+        :param body: Request body
+        :param headers: Request headers
         :return: A (status, response string) tuple
         """
         # Prepare the request path
-        if path[0] == "/":
-            path = path[1:]
-        path = urljoin(self.servlet_path, path)
+        path = urljoin(self.servlet_path, path.lstrip("/"))
 
-        # Request the end points
+        # Send the request
         conn = httplib.HTTPConnection("localhost", self.port)
-        conn.request("GET", path)
+        conn.request(method, path, body, headers or {})
         result = conn.getresponse()
         data = result.read()
         conn.close()
@@ -206,7 +293,7 @@ class DispatcherTest(unittest.TestCase):
         # Convert the response to a string
         return result.status, to_str(data)
 
-    def _http_post(self, path: str, body: str) -> Tuple[int, str]:
+    def _http_get(self, path: str) -> Tuple[int, str]:
         """
         Makes a HTTP GET request to the given path and returns the response
         as a string
@@ -214,20 +301,18 @@ class DispatcherTest(unittest.TestCase):
         :param path: Sub path for the dispatcher servlet
         :return: A (status, response string) tuple
         """
-        # Prepare the request path
-        if path[0] == "/":
-            path = path[1:]
-        path = urljoin(self.servlet_path, path)
+        return self._http_request("GET", path)
 
-        # Request the end points
-        conn = httplib.HTTPConnection("localhost", self.port)
-        conn.request("POST", path, body, {"Content-Type": "application/json"})
-        result = conn.getresponse()
-        data = result.read()
-        conn.close()
+    def _http_post(self, path: str, body: str) -> Tuple[int, str]:
+        """
+        Makes a HTTP POST request to the given path and returns the response
+        as a string
 
-        # Convert the response to a string
-        return result.status, to_str(data)
+        :param path: Sub path for the dispatcher servlet
+        :param body: Request body
+        :return: A (status, response string) tuple
+        """
+        return self._http_request("POST", path, body, {"Content-Type": "application/json"})
 
     def testInvalidPath(self) -> None:
         """
@@ -245,73 +330,49 @@ class DispatcherTest(unittest.TestCase):
 
         # Check result
         self.assertEqual(status, 200)
-        self.assertEqual(response, json.dumps(self.framework_uid))
+        self.assertEqual(json.loads(response), self.framework_uid)
 
     def testListEndpoints(self) -> None:
         """
         Checks if the list of endpoints is correctly given
         """
         # Register an exporter
-        context = self.framework.get_bundle_context()
+        context = self.context
         exporter = Exporter(context)
-        context.register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
+        self._register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
 
         # Empty list
-        status, response = self._http_get("/endpoints")
+        self._check_endpoints(exporter)
 
-        # Check result
-        self.assertEqual(status, 200)
-        self.assertListEqual(json.loads(response), [])
-
-        # Register some endpoints
+        # Register some endpoints, checking the list after the first one
+        # and once all of them are exported
         svc_regs = []
-        for _ in range(3):
-            # Register a service
+        for idx in range(3):
             svc_regs.append(
-                context.register_service(
-                    "sample.spec", object(), {pelix.remote.PROP_EXPORTED_INTERFACES: "*"}
-                )
+                self._register_service("sample.spec", object(), {pelix.remote.PROP_EXPORTED_INTERFACES: "*"})
             )
+            if idx == 0:
+                self._check_endpoints(exporter)
 
-            # Request the list of endpoints
-            status, response = self._http_get("/endpoints")
-
-            # Check result
-            self.assertEqual(status, 200)
-
-            # Get all endpoints ID
-            data = json.loads(response)
-            local_uids = [endpoint.uid for endpoint in exporter.endpoints]
-            servlet_uids = [item["uid"] for item in data]
-
-            self.assertCountEqual(servlet_uids, local_uids)
+        self.assertEqual(len(exporter.endpoints), 3)
+        self._check_endpoints(exporter)
 
         # Unregister them
         for svc_reg in svc_regs:
-            # Unregister the service
             svc_reg.unregister()
 
-            # Request the list of endpoints
-            status, response = self._http_get("/endpoints")
-
-            # Check result
-            self.assertEqual(status, 200)
-
-            # Get all endpoints ID
-            data = json.loads(response)
-            local_uids = [endpoint.uid for endpoint in exporter.endpoints]
-            servlet_uids = [item["uid"] for item in data]
-
-            self.assertCountEqual(servlet_uids, local_uids)
+        # Empty list again
+        self.assertListEqual(exporter.endpoints, [])
+        self._check_endpoints(exporter)
 
     def testEndpoint(self) -> None:
         """
         Checks the details of an endpoint
         """
         # Register an exporter
-        context = self.framework.get_bundle_context()
+        context = self.context
         exporter = Exporter(context)
-        context.register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
+        self._register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
 
         # With no UID given
         status, _ = self._http_get("/endpoint")
@@ -320,7 +381,7 @@ class DispatcherTest(unittest.TestCase):
         self.assertEqual(status, 404)
 
         # Register a service
-        svc_reg = context.register_service(
+        svc_reg = self._register_service(
             "sample.spec", object(), {pelix.remote.PROP_EXPORTED_INTERFACES: "*"}
         )
 
@@ -335,8 +396,8 @@ class DispatcherTest(unittest.TestCase):
 
         # Check the content
         data = json.loads(response)
-        for key, attr in (("uid", "uid"), ("sender", "framework"), ("name", "name")):
-            self.assertEqual(data[key], getattr(endpoint, attr))
+        expected = _endpoint_summary(endpoint)
+        self.assertDictEqual({key: data[key] for key in expected}, expected)
 
         # Unregister it
         svc_reg.unregister()
@@ -352,12 +413,12 @@ class DispatcherTest(unittest.TestCase):
         Tests the grab_endpoint method
         """
         # Register an exporter
-        context = self.framework.get_bundle_context()
+        context = self.context
         exporter = Exporter(context)
-        context.register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
+        self._register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
 
         # Register a service
-        svc_reg = context.register_service(
+        svc_reg = self._register_service(
             "sample.spec", object(), {pelix.remote.PROP_EXPORTED_INTERFACES: "*"}
         )
 
@@ -402,20 +463,20 @@ class DispatcherTest(unittest.TestCase):
         Tests the POST of endpoints
         """
         # Register an exporter
-        context = self.framework.get_bundle_context()
+        context = self.context
         exporter = Exporter(context)
-        context.register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
+        self._register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
 
         # Register an importer
         importer = ImportListener()
-        context.register_service(
+        self._register_service(
             pelix.remote.SERVICE_IMPORT_ENDPOINT_LISTENER,
             importer,
             {pelix.remote.PROP_REMOTE_CONFIGS_SUPPORTED: exporter.configs[0]},
         )
 
         # Register a service
-        context.register_service("sample.spec", object(), {pelix.remote.PROP_EXPORTED_INTERFACES: "*"})
+        self._register_service("sample.spec", object(), {pelix.remote.PROP_EXPORTED_INTERFACES: "*"})
 
         # Get the endpoint bean
         endpoint = exporter.endpoints[-1]
@@ -432,6 +493,7 @@ class DispatcherTest(unittest.TestCase):
 
         # Send the 'discovered' event
         status, response = self._http_post("endpoints", json.dumps([endpoint_data]))
+        self.addCleanup(self._forget_framework, endpoint_data["sender"])
         self.assertEqual(status, 200)
         self.assertEqual(response, "OK")
 
@@ -446,32 +508,23 @@ class DispatcherTest(unittest.TestCase):
         Tests the send_discovered' method
         """
         # Register an exporter
-        context = self.framework.get_bundle_context()
+        context = self.context
         exporter = Exporter(context)
-        context.register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
+        self._register_service(pelix.remote.SERVICE_EXPORT_PROVIDER, exporter, {})
 
         # Register a service
-        context.register_service("sample.spec", object(), {pelix.remote.PROP_EXPORTED_INTERFACES: "*"})
+        self._register_service("sample.spec", object(), {pelix.remote.PROP_EXPORTED_INTERFACES: "*"})
 
-        # Get the endpoint bean
+        # Get the endpoint bean and its expected description
         endpoint = exporter.endpoints[-1]
+        expected = _endpoint_summary(endpoint)
 
-        # Start a new HTTP server
-        with use_ipopo(context) as ipopo:
-            # Instantiate remote service components
-            # ... HTTP server
-            http = ipopo.instantiate(
-                "pelix.http.service.basic.factory", "http-server-2", {"pelix.http.port": 0}
-            )
-
-        # Keep the HTTP server port
-        port = http.get_access()[1]
-
-        # Replace the dispatcher servlet
+        # Register a fake dispatcher servlet next to the real one
+        port = self.port
         servlet = FakeSerlvet()
-        servlet_path = (self.servlet.get_access() or [])[1]
-        http.unregister(servlet_path)
-        http.register_servlet(servlet_path, servlet)
+        servlet_path = "/fake-dispatcher"
+        self.assertTrue(self.http.register_servlet(servlet_path, servlet))
+        self.addCleanup(self.http.unregister, servlet_path)
 
         for with_trailing in (True, False):
             # Test with a trailing slash in the path
@@ -492,8 +545,7 @@ class DispatcherTest(unittest.TestCase):
 
             # Should've got a single endpoint
             self.assertEqual(len(content), 1)
-            for key, attr in (("uid", "uid"), ("sender", "framework"), ("name", "name")):
-                self.assertEqual(content[0][key], getattr(endpoint, attr))
+            self.assertDictEqual({key: content[0][key] for key in expected}, expected)
 
         # Test with a servlet error (no error should be raised)
         servlet.error = True
@@ -31,6 +31,8 @@ class ImportListener:
     Imports listener
     """
 
+    __slots__ = ("events", "raise_exception")
+
     def __init__(self) -> None:
         """
         Sets up members
@@ -78,36 +80,56 @@ class ImportsRegistryTest(unittest.TestCase):
     """
 
     framework: pelix.framework.Framework
+    context: pelix.framework.BundleContext
+    registry_bundle: pelix.framework.Bundle
     service: pelix.remote.RemoteServiceRegistry
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpClass(cls) -> None:
         """
-        Sets up the test
+        Starts the framework shared by all tests
         """
         # Create the framework
-        self.framework = pelix.framework.create_framework(["pelix.ipopo.core"])
-        self.framework.start()
+        cls.framework = pelix.framework.create_framework(["pelix.ipopo.core"])
+        cls.framework.start()
 
-        # Install the registry
-        context = self.framework.get_bundle_context()
-        context.install_bundle("pelix.remote.registry").start()
+        # Install the registry: it is started by each test
+        cls.context = context = cls.framework.get_bundle_context()
+        cls.registry_bundle = context.install_bundle("pelix.remote.registry")
 
         # Get the framework UID
-        self.framework_uid = context.get_property(pelix.constants.FRAMEWORK_UID)
+        cls.framework_uid = context.get_property(pelix.constants.FRAMEWORK_UID)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        Stops the shared framework
+        """
+        pelix.framework.FrameworkFactory.delete_framework()
+
+        cls.framework = None  # type: ignore
+        cls.context = None  # type: ignore
+        cls.registry_bundle = None  # type: ignore
+
+    def setUp(self) -> None:
+        """
+        Sets up the test
+        """
+        # (Re)start the registry, to work on an empty instance
+        self.registry_bundle.start()
 
         # Get the service
-        svc_ref = context.get_service_reference(pelix.remote.RemoteServiceRegistry)
+        svc_ref = self.context.get_service_reference(pelix.remote.RemoteServiceRegistry)
         assert svc_ref is not None
-        self.service = context.get_service(svc_ref)
+        self.service = self.context.get_service(svc_ref)
 
     def tearDown(self) -> None:
         """
         Cleans up for next test
         """
-        # Stop the framework
-        pelix.framework.FrameworkFactory.delete_framework()
+        # Stopping the bundle kills the registry instance
+        self.registry_bundle.stop()
 
-        self.framework = None  # type: ignore
         self.service = None  # type: ignore
 
     def testAdd(self) -> None:
@@ -206,7 +228,7 @@ class ImportsRegistryTest(unittest.TestCase):
         Tests the listener
         """
         # Prepare endpoints
-        context = self.framework.get_bundle_context()
+        context = self.context
         endpoint = beans.ImportEndpoint(
             "service-uid", "some-framework", ["configA", "configB"], "name", "test.spec", {}
         )
@@ -278,13 +300,10 @@ class ImportsRegistryTest(unittest.TestCase):
         # Register the endpoint
         self.service.add(endpoint)
 
-        # Check its specifications: Python ones don't have a prefix
-        self.assertIn(spec_1, endpoint.specifications)
-        self.assertIn(spec_2, endpoint.specifications)
-        self.assertIn(spec_3, endpoint.specifications)
-
-        # Java one is kept as is
-        self.assertIn(java_specs[0], endpoint.specifications)
+        # Check its specifications: Python ones don't have a prefix, the Java
+        # one is kept as is
+        expected = {spec_1, spec_2, spec_3, java_specs[0]}
+        self.assertSetEqual(expected - set(endpoint.specifications), set(), "Missing specifications")
 
 
 # ------------------------------------------------------------------------------
@@ -6,15 +6,15 @@ Tests the Remote Services abstract transport classes
 :author: Thomas Calmant
 """
 
+import itertools
 import unittest
-import uuid
 from typing import Any, Dict, List, Optional, cast
 
 import pelix.constants
 import pelix.framework
 import pelix.remote
 import pelix.remote.transport.commons as commons
-from pelix.internals.registry import ServiceReference
+from pelix.internals.registry import ServiceReference, ServiceRegistration
 from pelix.ipopo.constants import use_ipopo
 from pelix.ipopo.decorators import ComponentFactory, Property, Provides
 from pelix.remote import RemoteServiceDispatcher, RemoteServiceError
@@ -35,12 +35,18 @@ TEST_CONFIGURATION = "test.config"
 # Test property
 TEST_PROPERTY = "test.config.test_property"
 
+# UID of the framework the imported endpoints come from
+REMOTE_FRAMEWORK_UID = "other-framework"
+
 # Events
 EXPORT_MAKE = 1
 IMPORT_MAKE = 2
 IMPORT_CLEAR = 3
 SERVICE_CALLED = 4
 
+# Values returned by the dummy services
+_SERVICE_VALUES = itertools.count()
+
 # ------------------------------------------------------------------------------
 
 
@@ -51,16 +57,16 @@ class DummyService:
 
     def __init__(self) -> None:
         """
-        Sets up a random value to be returned by the service method
+        Sets up a unique value to be returned by the service method
         """
-        self.value = uuid.uuid4()
+        self.value = next(_SERVICE_VALUES)
         self.events: List[int] = []
 
     def clear(self) -> None:
         """
         Clears the state
         """
-        del self.events[:]
+        self.events.clear()
 
     def call_me(self) -> Any:
         """
@@ -92,7 +98,7 @@ class Exporter(commons.AbstractRpcServiceExporter):
         """
         Clears the state
         """
-        del self.events[:]
+        self.events.clear()
 
     def make_endpoint_properties(
         self, svc_ref: ServiceReference[Any], name: str, fw_uid: str
@@ -146,7 +152,7 @@ class Importer(commons.AbstractRpcServiceImporter):
         """
         Clears the state
         """
-        del self.events[:]
+        self.events.clear()
 
     def make_service_proxy(self, endpoint: ImportEndpoint) -> Any:
         """
@@ -178,35 +184,64 @@ class AbstractCommonExporterTest(unittest.TestCase):
 
     framework: pelix.framework.Framework
     dispatcher: RemoteServiceDispatcher
+    context: pelix.framework.BundleContext
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpClass(cls) -> None:
         """
-        Sets up the test
+        Starts the framework shared by all tests
         """
         # Create the framework
-        self.framework = pelix.framework.create_framework(("pelix.ipopo.core", "pelix.remote.dispatcher"))
-        self.framework.start()
+        cls.framework = pelix.framework.create_framework(("pelix.ipopo.core", "pelix.remote.dispatcher"))
+        cls.framework.start()
 
         # Get the framework UID
-        context = self.framework.get_bundle_context()
-        self.framework_uid = context.get_property(pelix.constants.FRAMEWORK_UID)
+        context = cls.context = cls.framework.get_bundle_context()
+        cls.framework_uid = context.get_property(pelix.constants.FRAMEWORK_UID)
 
-        # Get the dispatcher and the imports registry
+        # Get the dispatcher
         svc_ref = context.get_service_reference(pelix.remote.RemoteServiceDispatcher)
         assert svc_ref is not None
-        self.dispatcher = context.get_service(svc_ref)
+        cls.dispatcher = context.get_service(svc_ref)
 
-    def tearDown(self) -> None:
+        # Register the test factory
+        with use_ipopo(context) as ipopo:
+            ipopo.register_factory(context, Exporter)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
         """
-        Cleans up for next test
+        Stops the shared framework
         """
-        # Stop the framework
-        self.framework.stop()
         pelix.framework.FrameworkFactory.delete_framework()
 
         # Clean up members
-        self.framework = None  # type: ignore
-        self.dispatcher = None  # type: ignore
+        cls.framework = None  # type: ignore
+        cls.dispatcher = None  # type: ignore
+        cls.context = None  # type: ignore
+
+    def setUp(self) -> None:
+        """
+        Sets up the test
+        """
+        # Services registered by the test
+        self._registrations: List[ServiceRegistration[Any]] = []
+
+    def tearDown(self) -> None:
+        """
+        Cleans up for next test
+        """
+        for svc_reg in self._registrations:
+            try:
+                svc_reg.unregister()
+            except pelix.constants.BundleException:
+                # Already unregistered by the test
+                pass
+
+        # Kill the exporter installed by the test
+        with use_ipopo(self.context) as ipopo:
+            if ipopo.is_registered_instance("exporter"):
+                ipopo.kill("exporter")
 
     def _install_exporter(self) -> Exporter:
         """
@@ -214,14 +249,22 @@ class AbstractCommonExporterTest(unittest.TestCase):
 
         :return: The Exporter component instance
         """
-        context = self.framework.get_bundle_context()
-        with use_ipopo(context) as ipopo:
-            # Register the factory
-            ipopo.register_factory(context, Exporter)
-
-            # Instantiate the component
+        with use_ipopo(self.context) as ipopo:
             return cast(Exporter, ipopo.instantiate(TEST_EXPORTER_FACTORY, "exporter", {}))
 
+    def _register_service(self, spec: str, service: Any, props: Dict[str, Any]) -> ServiceRegistration[Any]:
+        """
+        Registers a service, which will be unregistered after the test
+
+        :param spec: Service specification
+        :param service: Service instance
+        :param props: Service properties
+        :return: The service registration
+        """
+        svc_reg = self.context.register_service(spec, service, props)
+        self._registrations.append(svc_reg)
+        return svc_reg
+
     def testExportAny(self) -> None:
         """
         Tests the call to the exporter, even if no configuration is given
@@ -231,11 +274,8 @@ class AbstractCommonExporterTest(unittest.TestCase):
         self.assertListEqual(exporter.events, [])
 
         # Register an exported service
-        context = self.framework.get_bundle_context()
         service = object()
-        svc_reg = context.register_service(
-            "sample.spec", service, {pelix.remote.PROP_EXPORTED_INTERFACES: "*"}
-        )
+        svc_reg = self._register_service("sample.spec", service, {pelix.remote.PROP_EXPORTED_INTERFACES: "*"})
 
         # The exporter must have been called
         self.assertListEqual(exporter.events, [EXPORT_MAKE])
@@ -263,9 +303,8 @@ class AbstractCommonExporterTest(unittest.TestCase):
 
         for config in (exporter._kinds, "*"):
             # Register an exported service
-            context = self.framework.get_bundle_context()
             service = object()
-            svc_reg = context.register_service(
+            svc_reg = self._register_service(
                 "sample.spec",
                 service,
                 {pelix.remote.PROP_EXPORTED_INTERFACES: "*", pelix.remote.PROP_EXPORTED_CONFIGS: config},
@@ -292,11 +331,8 @@ class AbstractCommonExporterTest(unittest.TestCase):
         exporter = self._install_exporter()
 
         # Register an exported service
-        context = self.framework.get_bundle_context()
         service = DummyService()
-        svc_reg = context.register_service(
-            "sample.spec", service, {pelix.remote.PROP_EXPORTED_INTERFACES: "*"}
-        )
+        svc_reg = self._register_service("sample.spec", service, {pelix.remote.PROP_EXPORTED_INTERFACES: "*"})
 
         # The exporter must have been called
         self.assertListEqual(exporter.events, [EXPORT_MAKE])
@@ -323,6 +359,37 @@ class AbstractCommonExporterTest(unittest.TestCase):
         self.assertRaises(RemoteServiceError, exporter.dispatch, method_name, [])
         self.assertListEqual(service.events, [], "Service called after unregistration")
 
+    def testExportDispatchLongestName(self) -> None:
+        """
+        Tests the dispatch of calls to endpoints whose names prefix each other
+        """
+        # Install the export transport
+        exporter = self._install_exporter()
+
+        # Register two exported services, one name prefixing the other
+        service = DummyService()
+        service_sub = DummyService()
+        for svc, name in ((service, "test"), (service_sub, "test.sub")):
+            self._register_service(
+                "sample.spec",
+                svc,
+                {pelix.remote.PROP_EXPORTED_INTERFACES: "*", pelix.remote.PROP_ENDPOINT_NAME: name},
+            )
+
+        # The longest matching endpoint name must be used
+        self.assertEqual(exporter.dispatch("test.sub.call_me", []), service_sub.value)
+        self.assertListEqual(service_sub.events, [SERVICE_CALLED], "Service not called")
+        self.assertListEqual(service.events, [], "Wrong service called")
+        service_sub.clear()
+
+        self.assertEqual(exporter.dispatch("test.call_me", []), service.value)
+        self.assertListEqual(service.events, [SERVICE_CALLED], "Service not called")
+        self.assertListEqual(service_sub.events, [], "Wrong service called")
+
+        # Unknown endpoints
+        for method_name in ("call_me", ".call_me", "other.call_me", "tes.call_me"):
+            self.assertRaises(RemoteServiceError, exporter.dispatch, method_name, [])
+
     def testExportRename(self) -> None:
         """
         Tests the rename of an exported endpoint
@@ -331,12 +398,9 @@ class AbstractCommonExporterTest(unittest.TestCase):
         exporter = self._install_exporter()
 
         # Register an exported service
-        context = self.framework.get_bundle_context()
         service = DummyService()
         service_2 = DummyService()
-        svc_reg = context.register_service(
-            "sample.spec", service, {pelix.remote.PROP_EXPORTED_INTERFACES: "*"}
-        )
+        svc_reg = self._register_service("sample.spec", service, {pelix.remote.PROP_EXPORTED_INTERFACES: "*"})
 
         # Get the export endpoint
         endpoint = self.dispatcher.get_endpoints()[0]
@@ -368,7 +432,7 @@ class AbstractCommonExporterTest(unittest.TestCase):
         service.clear()
 
         # Register another service with the same name
-        svc_reg_2 = context.register_service(
+        svc_reg_2 = self._register_service(
             "sample.spec",
             service_2,
             {pelix.remote.PROP_EXPORTED_INTERFACES: "*", pelix.remote.PROP_ENDPOINT_NAME: name},
@@ -412,35 +476,53 @@ class AbstractCommonImporterTest(unittest.TestCase):
 
     framework: pelix.framework.Framework
     registry: pelix.remote.RemoteServiceRegistry
+    context: pelix.framework.BundleContext
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpClass(cls) -> None:
         """
-        Sets up the test
+        Starts the framework shared by all tests
         """
         # Create the framework
-        self.framework = pelix.framework.create_framework(("pelix.ipopo.core", "pelix.remote.registry"))
-        self.framework.start()
+        cls.framework = pelix.framework.create_framework(("pelix.ipopo.core", "pelix.remote.registry"))
+        cls.framework.start()
 
         # Get the framework UID
-        context = self.framework.get_bundle_context()
-        self.framework_uid = context.get_property(pelix.constants.FRAMEWORK_UID)
+        context = cls.context = cls.framework.get_bundle_context()
+        cls.framework_uid = context.get_property(pelix.constants.FRAMEWORK_UID)
 
         # Get the imports registry
         svc_ref = context.get_service_reference(pelix.remote.RemoteServiceRegistry)
         assert svc_ref is not None
-        self.registry = context.get_service(svc_ref)
+        cls.registry = context.get_service(svc_ref)
 
-    def tearDown(self) -> None:
+        # Register the test factory
+        with use_ipopo(context) as ipopo:
+            ipopo.register_factory(context, Importer)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
         """
-        Cleans up for next test
+        Stops the shared framework
         """
-        # Stop the framework
-        self.framework.stop()
         pelix.framework.FrameworkFactory.delete_framework()
 
         # Clean up members
-        self.framework = None  # type: ignore
-        self.registry = None  # type: ignore
+        cls.framework = None  # type: ignore
+        cls.registry = None  # type: ignore
+        cls.context = None  # type: ignore
+
+    def tearDown(self) -> None:
+        """
+        Cleans up for next test
+        """
+        # Kill the importer installed by the test
+        with use_ipopo(self.context) as ipopo:
+            if ipopo.is_registered_instance("importer"):
+                ipopo.kill("importer")
+
+        # Forget the endpoints a failed test might have left in the registry
+        self.registry.lost_framework(REMOTE_FRAMEWORK_UID)
 
     def _install_importer(self) -> Importer:
         """
@@ -448,12 +530,7 @@ class AbstractCommonImporterTest(unittest.TestCase):
 
         :return: The Importer component instance
         """
-        context = self.framework.get_bundle_context()
-        with use_ipopo(context) as ipopo:
-            # Register the factory
-            ipopo.register_factory(context, Importer)
-
-            # Instantiate the component
+        with use_ipopo(self.context) as ipopo:
             return cast(Importer, ipopo.instantiate(TEST_IMPORTER_FACTORY, "importer", {}))
 
     def testImportAny(self) -> None:
@@ -464,7 +541,7 @@ class AbstractCommonImporterTest(unittest.TestCase):
         importer = self._install_importer()
 
         # Prepare an import endpoint matching any configuration
-        endpoint = ImportEndpoint("import-uid", "other-framework", "*", "endpoint_name", ["some.spec"], {})
+        endpoint = ImportEndpoint("import-uid", REMOTE_FRAMEWORK_UID, "*", "endpoint_name", ["some.spec"], {})
 
         # Ensure the importer has not been called yet
         self.assertListEqual(importer.events, [], "Importer called before registration")
@@ -495,7 +572,7 @@ class AbstractCommonImporterTest(unittest.TestCase):
 
         # Prepare an import endpoint with an unknown configuration
         endpoint = ImportEndpoint(
-            "import-uid", "other-framework", "unknown-config", "endpoint_name", ["some.spec"], {}
+            "import-uid", REMOTE_FRAMEWORK_UID, "unknown-config", "endpoint_name", ["some.spec"], {}
         )
 
         # Register it
@@ -515,7 +592,7 @@ class AbstractCommonImporterTest(unittest.TestCase):
 
         # Prepare an import endpoint with a known configuration
         endpoint = ImportEndpoint(
-            "import-uid", "other-framework", importer._kinds, "endpoint_name", ["some.spec"], {}
+            "import-uid", REMOTE_FRAMEWORK_UID, importer._kinds, "endpoint_name", ["some.spec"], {}
         )
 
         # Register it
@@ -535,8 +612,7 @@ class AbstractCommonImporterTest(unittest.TestCase):
         importer = self._install_importer()
 
         # Prepare an import endpoint matching any configuration
-        fw_uid = "other-framework"
-        endpoint = ImportEndpoint("import-uid", fw_uid, "*", "endpoint_name", ["some.spec"], {})
+        endpoint = ImportEndpoint("import-uid", REMOTE_FRAMEWORK_UID, "*", "endpoint_name", ["some.spec"], {})
 
         # Register it
         self.registry.add(endpoint)
@@ -25,33 +25,23 @@ Tests remote services transport and discovery based on MQTT
 """
 
 import queue
+import sys
 import threading
 import time
 import unittest
 import uuid
-from typing import Any, Iterable, Optional, Tuple
+from multiprocessing import Queue
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import pelix.remote
 from pelix.framework import Framework, FrameworkFactory, create_framework
+from pelix.internals.events import ServiceEvent
 from pelix.internals.registry import ServiceReference
 from pelix.ipopo.constants import use_ipopo
 from tests.mqtt_utilities import find_mqtt_server
-from tests.utilities import WrappedProcess
-
-try:
-    # Try to import modules
-    import multiprocessing
-    from multiprocessing import Process, Queue
-
-    # IronPython fails when creating a queue
-    Queue()
-
-    # Trick to avoid pytest hanging
-    multiprocessing.set_start_method("spawn", force=True)
-except ImportError:
-    # Some interpreters don't have support for multiprocessing
-    raise unittest.SkipTest("Interpreter doesn't support multiprocessing")
 
+# Checks the multiprocessing support and selects the "spawn" start method
+from tests.utilities import WrappedProcess
 
 # ------------------------------------------------------------------------------
 
@@ -64,10 +54,6 @@ __docformat__ = "restructuredtext en"
 APP_ID = str(uuid.uuid4())
 SVC_SPEC = "pelix.test.remote"
 
-MQTT_SERVER = find_mqtt_server()
-if not MQTT_SERVER:
-    raise unittest.SkipTest("No valid MQTT server found")
-
 # ------------------------------------------------------------------------------
 
 
@@ -123,13 +109,35 @@ class RemoteService:
         self.event.set()
 
 
+class ServiceWaiter:
+    """
+    Service listener used to wait for the registration of a service
+    """
+
+    def __init__(self) -> None:
+        """
+        Sets up members
+        """
+        self.registered = threading.Event()
+
+    def service_changed(self, event: ServiceEvent[Any]) -> None:
+        """
+        Called by the framework when a service event occurs
+        """
+        if event.get_kind() == ServiceEvent.REGISTERED:
+            self.registered.set()
+
+
 # ------------------------------------------------------------------------------
 
 
-def load_framework(app_id: str, transport: str, components: Iterable[Tuple[str, str]]) -> Framework:
+def load_framework(
+    mqtt_server: str, app_id: str, transport: str, components: Iterable[Tuple[str, str]]
+) -> Framework:
     """
     Starts a Pelix framework in the local process
 
+    :param mqtt_server: Host name of the MQTT server
     :param app_id: Application ID
     :param transport: Name of the transport bundle to install
     :param components: Tuples (factory, name) of instances to start
@@ -151,30 +159,35 @@ def load_framework(app_id: str, transport: str, components: Iterable[Tuple[str,
         ipopo.instantiate(
             pelix.remote.FACTORY_DISCOVERY_MQTT,
             "mqtt-discovery",
-            {"mqtt.host": MQTT_SERVER, "application.id": app_id},
+            {"mqtt.host": mqtt_server, "application.id": app_id},
         )
 
         # Start other components
         for factory, name in components:
-            ipopo.instantiate(factory, name, {"mqtt.host": MQTT_SERVER})
+            ipopo.instantiate(factory, name, {"mqtt.host": mqtt_server})
 
     return framework
 
 
 def export_framework(
-    state_queue: Queue, app_id: str, transport: str, components: Iterable[Tuple[str, str]]
+    state_queue: Queue,
+    mqtt_server: str,
+    app_id: str,
+    transport: str,
+    components: Iterable[Tuple[str, str]],
 ) -> None:
     """
     Starts a Pelix framework, on the export side
 
     :param state_queue: Queue to store status
+    :param mqtt_server: Host name of the MQTT server
     :param app_id: Application ID
     :param transport: Name of the transport bundle to install
     :param components: Tuples (factory, name) of instances to start
     """
     try:
         # Load the framework
-        framework = load_framework(app_id, transport, components)
+        framework = load_framework(mqtt_server, app_id, transport, components)
         context = framework.get_bundle_context()
 
         # Register the exported service
@@ -205,6 +218,31 @@ class MqttTransportsTest(unittest.TestCase):
     Tests Pelix built-in Remote Services transports
     """
 
+    mqtt_server: str
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Looks for the MQTT server only when the tests are run
+        """
+        mqtt_server = find_mqtt_server()
+        if not mqtt_server:
+            raise unittest.SkipTest("No valid MQTT server found")
+
+        cls.mqtt_server = mqtt_server
+
+    @staticmethod
+    def _collect_states(status_queue: Queue, count: int) -> List[str]:
+        """
+        Reads the given number of states sent by the peer
+
+        :param status_queue: Queue the peer writes its states to
+        :param count: Number of states to read
+        :return: The states, in reception order
+        :raise queue.Empty: Peer took to long to answer
+        """
+        return [status_queue.get(True, 10) for _ in range(count)]
+
     def __run_test(
         self, transport_bundle: str, exporter_factory: str, importer_factory: str, test_kwargs: bool = True
     ) -> None:
@@ -225,7 +263,8 @@ class MqttTransportsTest(unittest.TestCase):
         print("Starting...")
         status_queue = Queue()
         peer = WrappedProcess(
-            target=export_framework, args=(status_queue, APP_ID, transport_bundle, components)
+            target=export_framework,
+            args=(status_queue, self.mqtt_server, APP_ID, transport_bundle, components),
         )
         peer.start()
 
@@ -235,16 +274,20 @@ class MqttTransportsTest(unittest.TestCase):
             self.assertEqual(state, "ready")
 
             # Load the local framework (after the fork)
-            framework = load_framework(APP_ID, transport_bundle, components)
+            framework = load_framework(self.mqtt_server, APP_ID, transport_bundle, components)
             context = framework.get_bundle_context()
 
-            # Look for the remote service
-            for _ in range(30):
+            # Wait for the remote service to be imported
+            waiter = ServiceWaiter()
+            context.add_service_listener(waiter, specification=SVC_SPEC)
+            try:
                 svc_ref: Optional[ServiceReference[Any]] = context.get_service_reference(SVC_SPEC)
-                if svc_ref is not None:
-                    break
-                time.sleep(0.5)
-            else:
+                if svc_ref is None and waiter.registered.wait(15):
+                    svc_ref = context.get_service_reference(SVC_SPEC)
+            finally:
+                context.remove_service_listener(waiter)
+
+            if svc_ref is None:
                 self.fail("Remote Service not found")
 
             # Get it
@@ -256,44 +299,35 @@ class MqttTransportsTest(unittest.TestCase):
             self.assertEqual(state, "call-dummy")
             self.assertIsNone(result, f"Dummy didn't returned None: {result}")
 
-            # Echo call
-            for value in (None, "Test", 42, [1, 2, 3], {"a": "b"}):
-                result = svc.echo(value)
-
-                # Check state
-                state = status_queue.get(True, 10)
-                self.assertEqual(state, "call-echo")
-
-                # Check result
-                self.assertEqual(result, value)
+            # Echo calls, states are checked once all calls are done
+            values = [None, "Test", 42, [1, 2, 3], {"a": "b"}]
+            results = [svc.echo(value) for value in values]
+            self.assertListEqual(self._collect_states(status_queue, len(values)), ["call-echo"] * len(values))
+            for value, result in zip(values, results):
+                with self.subTest(value=value):
+                    self.assertEqual(result, value)
 
             if test_kwargs:
                 # Keyword arguments
                 sample_text = "SomeSampleText"
-
-                # Test as-is with default arguments
-                result = svc.keywords(text=sample_text)
-                state = status_queue.get(True, 10)
-                self.assertEqual(state, "call-keyword")
-                self.assertEqual(result, sample_text.upper())
-
-                # Test with keywords in the same order as positional arguments
-                result = svc.keywords(text=sample_text, to_lower=True)
-                state = status_queue.get(True, 10)
-                self.assertEqual(state, "call-keyword")
-                self.assertEqual(result, sample_text.lower())
-
-                result = svc.keywords(text=sample_text, to_lower=False)
-                state = status_queue.get(True, 10)
-                self.assertEqual(state, "call-keyword")
-                self.assertEqual(result, sample_text.upper())
-
-                # Test with keywords in a different order
-                # than positional arguments
-                result = svc.keywords(to_lower=True, text=sample_text)
-                state = status_queue.get(True, 10)
-                self.assertEqual(state, "call-keyword")
-                self.assertEqual(result, sample_text.lower())
+                kwargs_cases: List[Tuple[Dict[str, Any], str]] = [
+                    # Test as-is with default arguments
+                    ({"text": sample_text}, sample_text.upper()),
+                    # Test with keywords in the same order as positional arguments
+                    ({"text": sample_text, "to_lower": True}, sample_text.lower()),
+                    ({"text": sample_text, "to_lower": False}, sample_text.upper()),
+                    # Test with keywords in a different order than positional
+                    # arguments
+                    ({"to_lower": True, "text": sample_text}, sample_text.lower()),
+                ]
+                results = [svc.keywords(**kwargs) for kwargs, _ in kwargs_cases]
+                self.assertListEqual(
+                    self._collect_states(status_queue, len(kwargs_cases)),
+                    ["call-keyword"] * len(kwargs_cases),
+                )
+                for (kwargs, expected), result in zip(kwargs_cases, results):
+                    with self.subTest(kwargs=kwargs):
+                        self.assertEqual(result, expected)
 
             # Exception handling
             try:
@@ -306,7 +340,7 @@ class MqttTransportsTest(unittest.TestCase):
                 self.fail("No exception raised calling 'error'")
 
             # Call undefined method
-            self.assertRaises(Exception, svc.undefined)
+            self.assertRaises(pelix.remote.RemoteServiceError, svc.undefined)
 
             try:
                 # Stop the peer
@@ -320,8 +354,10 @@ class MqttTransportsTest(unittest.TestCase):
             state = status_queue.get(True, 10)
             self.assertEqual(state, "stopping")
 
-            # Wait a bit more, to let coverage save its files
-            time.sleep(0.1)
+            if "coverage" in sys.modules:
+                # The peer is wrapped by coverage: wait a bit more, to let it
+                # save its files
+                time.sleep(0.1)
         finally:
             # Stop everything (and delete the framework in any case
             FrameworkFactory.delete_framework()
@@ -30,12 +30,13 @@ class EndpointDescriptionTests(unittest.TestCase):
     Tests the RSA EndpointDescription module/class
     """
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """
-        Prepares a framework and a registers a service to export
+        Prepares a framework shared by all tests
         """
         # Create the framework
-        self.framework = pelix.framework.create_framework(
+        cls.framework = pelix.framework.create_framework(
             [
                 "pelix.ipopo.core",
                 "pelix.http.basic",
@@ -44,13 +45,13 @@ class EndpointDescriptionTests(unittest.TestCase):
             ],
             {"ecf.xmlrpc.server.hostname": "localhost"},
         )
-        self.framework.start()
+        cls.framework.start()
 
         # Get the RSA service
-        context = self.framework.get_bundle_context()
+        context = cls.context = cls.framework.get_bundle_context()
         svc_ref = context.get_service_reference(pelix.rsa.RemoteServiceAdmin)
         assert svc_ref is not None
-        self.rsa = cast(
+        cls.rsa = cast(
             rsa.RemoteServiceAdminImpl,
             context.get_service(svc_ref),
         )
@@ -63,12 +64,32 @@ class EndpointDescriptionTests(unittest.TestCase):
                 {"pelix.http.address": "localhost", "pelix.http.port": 0},
             )
 
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """
         Stops the framework
         """
         pelix.framework.FrameworkFactory.delete_framework()
 
+    def _export(self, specs):
+        """
+        Registers and exports a service with XML-RPC. The export is closed
+        and the service unregistered at the end of the test.
+
+        :param specs: Specifications of the service
+        :return: The description of the exported endpoint
+        """
+        svc_reg = self.context.register_service(specs, object(), {})
+        self.addCleanup(svc_reg.unregister)
+        export_reg = self.rsa.export_service(
+            svc_reg.get_reference(),
+            {rsa.SERVICE_EXPORTED_INTERFACES: "*", rsa.SERVICE_EXPORTED_CONFIGS: "ecf.xmlrpc.server"},
+        )[0]
+        # Cleanups run in reverse order: the export is closed before the
+        # service is unregistered
+        self.addCleanup(export_reg.close)
+        return export_reg.get_description()
+
     def test_encode_list(self):
         """
         Tests encode_list()
@@ -84,8 +105,7 @@ class EndpointDescriptionTests(unittest.TestCase):
 
         # Decode
         res_2 = rsa_ed.decode_list(res, "toto")
-        for l, r in zip(list_, res_2):
-            self.assertEqual(r, str(l))
+        self.assertEqual([str(i) for i in list_], list(res_2))
 
     def test_package_name(self):
         """
@@ -103,17 +123,8 @@ class EndpointDescriptionTests(unittest.TestCase):
         """
         Tests encode_osgi_props()
         """
-        # Prepare a service for export
-        context = self.framework.get_bundle_context()
-        specs = ["foo", "bar"]
-        svc_reg = context.register_service(specs, object(), {})
-        svc_ref = svc_reg.get_reference()
-
-        # Export the service
-        export_reg = self.rsa.export_service(
-            svc_ref, {rsa.SERVICE_EXPORTED_INTERFACES: "*", rsa.SERVICE_EXPORTED_CONFIGS: "ecf.xmlrpc.server"}
-        )[0]
-        ed = export_reg.get_description()
+        # Export a service
+        ed = self._export(["foo", "bar"])
 
         # Encode properties
         res = rsa_ed.encode_osgi_props(ed)
@@ -126,30 +137,20 @@ class EndpointDescriptionTests(unittest.TestCase):
         # Decode
         res_2 = rsa_ed.decode_osgi_props(res)
 
+        # Ensure we have list & strings
         ed_props = ed.get_properties()
-        for key in res:
-            # Ensure we have list & strings
-            ed_prop = ed_props[key]
-            if not isinstance(ed_prop, (str, list, type(None))):
-                ed_prop = str(ed_prop)
-
-            self.assertEqual(ed_prop, res_2[key])
+        expected = {
+            key: ed_props[key] if isinstance(ed_props[key], (str, list, type(None))) else str(ed_props[key])
+            for key in res
+        }
+        self.assertDictEqual(expected, {key: res_2[key] for key in res})
 
     def test_encode_endpoint_props(self):
         """
         Tests encode_endpoint_props()
         """
-        # Prepare a service for export
-        context = self.framework.get_bundle_context()
-        specs = ["foo", "bar"]
-        svc_reg = context.register_service(specs, object(), {})
-        svc_ref = svc_reg.get_reference()
-
-        # Export the service
-        export_reg = self.rsa.export_service(
-            svc_ref, {rsa.SERVICE_EXPORTED_INTERFACES: "*", rsa.SERVICE_EXPORTED_CONFIGS: "ecf.xmlrpc.server"}
-        )[0]
-        ed = export_reg.get_description()
+        # Export a service
+        ed = self._export(["foo", "bar"])
 
         # Encode properties
         res = rsa_ed.encode_endpoint_props(ed)
@@ -162,42 +163,18 @@ class EndpointDescriptionTests(unittest.TestCase):
         # Decode
         res_2 = rsa_ed.decode_endpoint_props(res)
 
+        # Ensure we have the same types
         ed_props = ed.get_properties()
-        for key in res:
-            # Ensure we have the same types
-            ed_prop = ed_props[key]
-            res_prop = res_2[key]
-            if isinstance(res_prop, str):
-                ed_prop = str(ed_prop)
-
-            self.assertEqual(ed_prop, res_prop)
+        expected = {key: str(ed_props[key]) if isinstance(res_2[key], str) else ed_props[key] for key in res}
+        self.assertDictEqual(expected, {key: res_2[key] for key in res})
 
     def test_compare(self):
         """
         Tests endpoints comparisons
         """
-        # Prepare a service for export
-        context = self.framework.get_bundle_context()
-        specs_1 = ["foo", "bar"]
-        svc_reg_1 = context.register_service(specs_1, object(), {})
-        svc_ref_1 = svc_reg_1.get_reference()
-
-        specs_2 = ["foo", "baz"]
-        svc_reg_2 = context.register_service(specs_2, object(), {})
-        svc_ref_2 = svc_reg_2.get_reference()
-
-        # Export the services
-        export_reg_1 = self.rsa.export_service(
-            svc_ref_1,
-            {rsa.SERVICE_EXPORTED_INTERFACES: "*", rsa.SERVICE_EXPORTED_CONFIGS: "ecf.xmlrpc.server"},
-        )[0]
-        ed_1 = export_reg_1.get_description()
-
-        export_reg_2 = self.rsa.export_service(
-            svc_ref_2,
-            {rsa.SERVICE_EXPORTED_INTERFACES: "*", rsa.SERVICE_EXPORTED_CONFIGS: "ecf.xmlrpc.server"},
-        )[0]
-        ed_2 = export_reg_2.get_description()
+        # Export two services
+        ed_1 = self._export(["foo", "bar"])
+        ed_2 = self._export(["foo", "baz"])
 
         # Just ensure that str() works
         fw_uid = self.framework.get_property(FRAMEWORK_UID)
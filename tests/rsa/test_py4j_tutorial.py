@@ -6,17 +6,18 @@ Tests the RSA Py4J provider, using the tutorial
 :author: Thomas Calmant
 """
 
-import io
 import os
 import pathlib
+import queue
+import shutil
 import subprocess
 import sys
 import tarfile
-import tempfile
+import threading
 import time
 import unittest
 from contextlib import contextmanager
-from typing import Any, Generator, Iterable, Optional
+from typing import IO, Any, Generator, Iterable, Iterator, Optional, Tuple
 from urllib.request import urlopen
 
 from pelix.framework import create_framework
@@ -25,9 +26,9 @@ from pelix.internals.registry import ServiceReference
 try:
     import osgiservicebridge
 except ImportError:
-    unittest.skip("OSGi Service Bridge not available")
+    raise unittest.SkipTest("OSGi Service Bridge not available")
 
-unittest.skip("Skipping Py4J tests due to issues with Karaf not starting correctly")
+raise unittest.SkipTest("Skipping Py4J tests due to issues with Karaf not starting correctly")
 
 # ------------------------------------------------------------------------------
 
@@ -45,12 +46,11 @@ def install_karaf(folder_str: Optional[str] = None) -> pathlib.Path:
 
     :param folder: Folder where to decompress the TAR file
     """
-    cur_dir = pathlib.Path().absolute()
     if folder_str:
         folder = pathlib.Path(folder_str)
         folder.mkdir(parents=True, exist_ok=True)
     else:
-        folder = cur_dir
+        folder = pathlib.Path().absolute()
 
     try:
         # Check if Karaf already exists
@@ -59,46 +59,45 @@ def install_karaf(folder_str: Optional[str] = None) -> pathlib.Path:
         return root
     except IOError:
         print("Karaf not found, installing it.")
-        with tempfile.TemporaryFile() as fd:
-            with urlopen(KARAF_URL) as req:
-                fd.write(req.read())
-
-            fd.seek(0)
-            with tarfile.open(fileobj=fd, mode="r:gz") as tar:
-
-                def is_within_directory(directory: str, target: str) -> bool:
-                    abs_directory = os.path.abspath(directory)
-                    abs_target = os.path.abspath(target)
-
-                    prefix = os.path.commonprefix([abs_directory, abs_target])
-
-                    return prefix == abs_directory
-
-                def safe_extract(
-                    tar: tarfile.TarFile,
-                    path: str = ".",
-                    members: Optional[Iterable[tarfile.TarInfo]] = None,
-                    *,
-                    numeric_owner: bool = False
-                ) -> None:
-                    for member in tar.getmembers():
-                        member_path = os.path.join(path, member.name)
-                        if not is_within_directory(path, member_path):
-                            raise Exception("Attempted Path Traversal in Tar File")
-
-                    # Filter out examples: paths are too long for Windows
-                    filtered_members = (m for m in members or tar.getmembers() if "examples" not in m.path)
-
-                    try:
-                        os.chdir(folder)
+        # Extract the archive while downloading it: the archive is about 100 MB
+        with urlopen(KARAF_URL) as req, tarfile.open(fileobj=req, mode="r|gz") as tar:
+
+            def is_within_directory(directory: str, target: str) -> bool:
+                abs_directory = os.path.abspath(directory)
+                abs_target = os.path.abspath(target)
+
+                prefix = os.path.commonprefix([abs_directory, abs_target])
+
+                return prefix == abs_directory
+
+            def safe_extract(
+                tar: tarfile.TarFile,
+                path: str = ".",
+                members: Optional[Iterable[tarfile.TarInfo]] = None,
+                *,
+                numeric_owner: bool = False
+            ) -> None:
+                def filtered_members() -> Iterator[tarfile.TarInfo]:
+                    # Members are read one at a time from the stream
+                    for member in members or tar:
+                        # Filter out examples: paths are too long for Windows
+                        if "examples" in member.path:
+                            continue
+
+                        # The "data" filter rejects path traversals on newer versions
                         if sys.version_info < (3, 12):
-                            tar.extractall(path, filtered_members, numeric_owner=numeric_owner)
-                        else:
-                            tar.extractall(path, filtered_members, numeric_owner=numeric_owner, filter="data")
-                    finally:
-                        os.chdir(cur_dir)
+                            member_path = os.path.join(path, member.name)
+                            if not is_within_directory(path, member_path):
+                                raise Exception("Attempted Path Traversal in Tar File")
 
-                safe_extract(tar)
+                        yield member
+
+                if sys.version_info < (3, 12):
+                    tar.extractall(path, filtered_members(), numeric_owner=numeric_owner)
+                else:
+                    tar.extractall(path, filtered_members(), numeric_owner=numeric_owner, filter="data")
+
+            safe_extract(tar, str(folder.absolute()))
             return folder
 
 
@@ -124,13 +123,33 @@ def find_karaf_root(folder: Optional[pathlib.Path] = None) -> pathlib.Path:
     raise IOError("Karaf folder not found in {}".format(folder))
 
 
+def read_output(stream: IO[bytes], output: "queue.Queue[bytes]") -> None:
+    """
+    Reads the output of a process until it ends. Consuming the output
+    continuously avoids the process to be blocked on a full pipe.
+
+    :param stream: Output stream of the process
+    :param output: Queue receiving the chunks of output, then an empty one
+    """
+    while True:
+        # Read what is available, without waiting for a full block: the
+        # prompt isn't followed by anything
+        data = stream.read1(4096)  # type: ignore
+        output.put(data)
+        if not data:
+            # Process ended
+            break
+
+
 @contextmanager
-def start_karaf(karaf_root: pathlib.Path) -> Generator[subprocess.Popen, None, None]:
+def start_karaf(
+    karaf_root: pathlib.Path,
+) -> Generator[Tuple[subprocess.Popen, "queue.Queue[bytes]"], None, None]:
     """
     Starts Karaf
 
     :param karaf_root: Root of the Karaf installation (contains bin/)
-    :return: A Popen object
+    :return: A Popen object and the queue receiving its output
     """
     if os.name == "nt":
         script_name = "karaf.bat"
@@ -146,50 +165,60 @@ def start_karaf(karaf_root: pathlib.Path) -> Generator[subprocess.Popen, None, N
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
         )
-        yield karaf
+
+        output: "queue.Queue[bytes]" = queue.Queue()
+        threading.Thread(
+            target=read_output, args=(karaf.stdout, output), name="Karaf-Output", daemon=True
+        ).start()
+        yield karaf, output
     finally:
         if karaf is not None:
             karaf.kill()
             karaf.wait(1)
             karaf = None
 
-def wait_for_prompt(process: subprocess.Popen, prompt: str = "karaf@root()>") -> None:
+def wait_for_prompt(
+    output: "queue.Queue[bytes]", prompt: str = "karaf@root()>", timeout: float = 120
+) -> None:
     """
-    Reads the stdout of a process until a prompt is seen
+    Reads the output of a process until a prompt is seen
 
-    :param process: A Popen object, with decoded I/O
+    :param output: Queue filled by read_output()
     :param prompt: The string to look for
+    :param timeout: Maximum time to wait for a new output, in seconds
+    :raise IOError: No output received in time
     """
-    if process.stdout is None:
-        raise IOError("Can't read from process")
-
     charset = "utf-8" if not os.name == "nt" else "cp850"
 
-    buffer = io.BytesIO()
+    # Both charsets are ASCII-compatible: look for the encoded prompt, which
+    # avoids decoding incomplete characters
+    raw_prompt = prompt.encode(charset)
+
+    buffer = b""
     while True:
-        data = process.stdout.read(1)
+        try:
+            data = output.get(timeout=timeout)
+        except queue.Empty:
+            raise IOError("Prompt not found after {} seconds".format(timeout))
+
         if not data:
             # Process ended
             return
-        elif data == b"\n":
-            # Got a new line, reset the buffer
-            try:
-                print("-", buffer.getvalue().decode(charset))
-            except UnicodeDecodeError:
-                print("Error decoding line", buffer.getvalue())
 
-            buffer = io.BytesIO()
-        else:
-            buffer.write(data)
+        buffer += data
+        found = raw_prompt in buffer
+
+        # Print complete lines, keep the last incomplete one
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
             try:
-                # Try decoding the whole buffer
-                output = buffer.getvalue().decode(charset)
-                if prompt in output:
-                    # Found the prompt
-                    return
+                print("-", line.decode(charset))
             except UnicodeDecodeError:
-                # Ignore errors, we might have an incomplete character
-                pass
+                print("Error decoding line", line)
+
+        if found:
+            # Found the prompt
+            return
 
 
 @contextmanager
@@ -206,24 +235,24 @@ def use_karaf() -> Generator[subprocess.Popen, None, None]:
     karaf_root = find_karaf_root(karaf_path)
 
     start = time.time()
-    with start_karaf(karaf_root) as karaf:
+    with start_karaf(karaf_root) as (karaf, output):
         if karaf.stdin is None or karaf.stdout is None:
             raise IOError("Can't access Karaf I/O")
 
         # Wait for Karaf to start
-        wait_for_prompt(karaf)
+        wait_for_prompt(output)
         print(round(time.time() - start, 3), "- Karaf started")
 
         # Add the ECF repository
         karaf.stdin.write(b"feature:repo-add https://download.eclipse.org/rt/ecf/latest/karaf-features.xml\n")
         karaf.stdin.flush()
-        wait_for_prompt(karaf)
+        wait_for_prompt(output)
         print(round(time.time() - start, 3), "- ECF repository added")
 
         # Install the tutorial sample
         karaf.stdin.write(b"feature:install -v ecf-rs-examples-python.java-hello\n")
         karaf.stdin.flush()
-        wait_for_prompt(karaf)
+        wait_for_prompt(output)
         print(round(time.time() - start, 3), "- Feature installed")
 
         # Give hand to the caller
@@ -251,15 +280,7 @@ class Py4JTutorialTest(unittest.TestCase):
         Preliminary checks
         """
         # Check if Java is installed
-        try:
-            java = subprocess.Popen(
-                ["java -version"],
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-            )
-            java.wait()
-        except OSError:
+        if shutil.which("java") is None:
             raise unittest.SkipTest("Java is not installed.")
 
     def test_service_import(self) -> None:
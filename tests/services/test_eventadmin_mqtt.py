@@ -148,11 +148,18 @@ class EventAdminMqttBridgeTest(unittest.TestCase):
     Tests the EventAdmin MQTT bridge service
     """
 
-    HOST = find_mqtt_server()
+    HOST: Optional[str]
     PORT = 1883
 
     framework: pelix.framework.Framework
 
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Looks for the MQTT server when the tests are run, not when collected
+        """
+        cls.HOST = find_mqtt_server()
+
     def assertDictContains(self, subset: Dict[Any, Any], container: Dict[Any, Any]) -> None:
         """
         Ensures that the given subset exists in the container
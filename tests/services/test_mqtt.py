@@ -6,16 +6,17 @@ Tests the MQTT service
 :author: Thomas Calmant
 """
 
-import random
+import secrets
 import shutil
-import string
 import tempfile
+import threading
 import time
 import unittest
 from typing import Any, List, Optional, Tuple, Union
 
 import pelix.framework
 import pelix.services as services
+from pelix.internals.events import ServiceEvent
 from pelix.internals.registry import ServiceReference
 from pelix.misc.mqtt_client import MqttClient
 from tests.mqtt_utilities import find_mqtt_server
@@ -38,12 +39,50 @@ class Listener:
         Sets up members
         """
         self.messages: List[Tuple[str, Union[str, bytes], int]] = []
+        self.__condition = threading.Condition()
 
     def handle_mqtt_message(self, topic: str, payload: Union[str, bytes], qos: int) -> None:
         """
         Got a message
         """
-        self.messages.append((topic, payload, qos))
+        with self.__condition:
+            self.messages.append((topic, payload, qos))
+            self.__condition.notify_all()
+
+    def pop_message(self, timeout: float) -> Optional[Tuple[str, Union[str, bytes], int]]:
+        """
+        Waits for a message and pops the last one received
+
+        :param timeout: Maximum time to wait for a message, in seconds
+        :return: A (topic, payload, qos) tuple, or None if no message arrived in time
+        """
+        with self.__condition:
+            if self.__condition.wait_for(lambda: self.messages, timeout):
+                return self.messages.pop()
+
+        return None
+
+
+class ServiceWaiter:
+    """
+    Service listener used to wait for a kind of service event
+    """
+
+    def __init__(self, kind: int) -> None:
+        """
+        Sets up members
+
+        :param kind: Kind of service event to wait for
+        """
+        self.kind = kind
+        self.event = threading.Event()
+
+    def service_changed(self, event: ServiceEvent[Any]) -> None:
+        """
+        Called by the framework when a service event occurs
+        """
+        if event.get_kind() == self.kind:
+            self.event.set()
 
 
 class MqttServiceTest(unittest.TestCase):
@@ -51,44 +90,59 @@ class MqttServiceTest(unittest.TestCase):
     Tests the MQTT utility service
     """
 
-    HOST = find_mqtt_server()
+    HOST: Optional[str]
     PORT = 1883
 
+    conf_dir: str
     framework: pelix.framework.Framework
     config_ref: Optional[ServiceReference[services.IConfigurationAdmin]]
     config: services.IConfigurationAdmin
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpClass(cls) -> None:
         """
-        Prepares a framework and a registers a service to export
+        Prepares a framework shared by all tests
         """
+        # Look for the MQTT server when the tests are run, not when collected
+        cls.HOST = find_mqtt_server()
+
         # Prepare a temporary configuration folder
-        self.conf_dir = tempfile.mkdtemp()
+        cls.conf_dir = tempfile.mkdtemp()
 
         # Create the framework
         # The MQTT component is automatically started
-        self.framework = pelix.framework.create_framework(
+        cls.framework = pelix.framework.create_framework(
             ("pelix.ipopo.core", "pelix.services.configadmin", "pelix.services.mqtt"),
-            {"configuration.folder": self.conf_dir},
+            {"configuration.folder": cls.conf_dir},
         )
-        self.framework.start()
+        cls.framework.start()
 
         # Get the configuration admin service
-        context = self.framework.get_bundle_context()
-        self.config_ref = context.get_service_reference(services.IConfigurationAdmin)
-        assert self.config_ref is not None
-        self.config = context.get_service(self.config_ref)
+        context = cls.framework.get_bundle_context()
+        cls.config_ref = context.get_service_reference(services.IConfigurationAdmin)
+        assert cls.config_ref is not None
+        cls.config = context.get_service(cls.config_ref)
 
-    def tearDown(self) -> None:
+    @classmethod
+    def tearDownClass(cls) -> None:
         """
-        Cleans up for next test
+        Stops the shared framework
         """
-        # Stop the framework
-        pelix.framework.FrameworkFactory.delete_framework(self.framework)
-        self.framework = None  # type: ignore
+        pelix.framework.FrameworkFactory.delete_framework(cls.framework)
+        cls.framework = None  # type: ignore
 
         # Clean up
-        shutil.rmtree(self.conf_dir)
+        shutil.rmtree(cls.conf_dir)
+
+    def tearDown(self) -> None:
+        """
+        Cleans up for next test
+        """
+        # Delete the MQTT connections configured by the test
+        for config in self.config.list_configurations(
+            f"({services.CONFIG_PROP_FACTORY_PID}={services.MQTT_CONNECTOR_FACTORY_PID})"
+        ):
+            config.delete()
 
     def test_no_config(self) -> None:
         """
@@ -114,17 +168,19 @@ class MqttServiceTest(unittest.TestCase):
 
         # Setup MQTT connection
         config = self.config.create_factory_configuration(services.MQTT_CONNECTOR_FACTORY_PID)
-        config.update({"host": self.HOST, "port": self.PORT})
+        ldap_filter = f"(id={config.get_pid()})"
 
         # Wait for service
-        for _ in range(10):
-            svc_ref = context.get_service_reference(
-                services.SERVICE_MQTT_CONNECTION, f"(id={config.get_pid()})"
-            )
-            if svc_ref is not None:
-                break
-            time.sleep(0.5)
-        else:
+        waiter = ServiceWaiter(ServiceEvent.REGISTERED)
+        context.add_service_listener(waiter, ldap_filter, services.SERVICE_MQTT_CONNECTION)
+        try:
+            config.update({"host": self.HOST, "port": self.PORT})
+            waiter.event.wait(5)
+        finally:
+            context.remove_service_listener(waiter)
+
+        svc_ref = context.get_service_reference(services.SERVICE_MQTT_CONNECTION, ldap_filter)
+        if svc_ref is None:
             self.fail("Connection Service not found")
         return config, svc_ref
 
@@ -144,19 +200,18 @@ class MqttServiceTest(unittest.TestCase):
         self.assertEqual(props["port"], self.PORT)
         self.assertEqual(props["id"], config.get_pid())
 
-        # Delete configuration
-        config.delete()
-
-        # Wait for service to be unregistered
-        context = self.framework.get_bundle_context()
-        for _ in range(10):
-            svc_ref = context.get_service_reference(
-                services.SERVICE_MQTT_CONNECTION, "(id={})".format(config.get_pid())
-            )
-            if svc_ref is None:
-                break
-            time.sleep(0.5)
-        else:
+        # Delete configuration and wait for service to be unregistered
+        ldap_filter = "(id={})".format(config.get_pid())
+        waiter = ServiceWaiter(ServiceEvent.UNREGISTERING)
+        context.add_service_listener(waiter, ldap_filter, services.SERVICE_MQTT_CONNECTION)
+        try:
+            config.delete()
+            waiter.event.wait(5)
+        finally:
+            context.remove_service_listener(waiter)
+
+        svc_ref = context.get_service_reference(services.SERVICE_MQTT_CONNECTION, ldap_filter)
+        if svc_ref is not None:
             self.fail("Connection Service still there")
 
     def __send_message(self, client: MqttClient, topic: str, qos: int) -> bytes:
@@ -168,12 +223,28 @@ class MqttServiceTest(unittest.TestCase):
         :param qos: Requested quality of service
         :return: Payload of the message
         """
-        payload = list(string.ascii_letters)
-        random.shuffle(payload)
-        raw_payload = "".join(payload).encode("utf-8")
+        # Unique payload of 52 printable characters
+        raw_payload = secrets.token_urlsafe(39).encode("ascii")
         client.publish(topic, raw_payload, qos=qos)
         return raw_payload
 
+    def _check_no_message(self, listener: Listener, topic: Optional[str] = None, timeout: float = 3) -> None:
+        """
+        Checks that the listener doesn't receive a message during the given time
+
+        :param listener: The MQTT listener
+        :param topic: Topic of the unexpected messages (None for any topic)
+        :param timeout: Time to wait for messages, in seconds
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            message = listener.pop_message(deadline - time.monotonic())
+            if message is None:
+                return
+
+            if topic is None or message[0] == topic:
+                self.fail(f"Got an unexpected message on {message[0]}")
+
     def test_messages(self) -> None:
         """
         Tests messages publication and reception
@@ -204,14 +275,10 @@ class MqttServiceTest(unittest.TestCase):
         payload = self.__send_message(mqtt_1, topic, 1)
 
         # Wait for it
-        for _ in range(10):
-            try:
-                msg_topic, msg_payload, qos = listener.messages.pop()
-                break
-            except IndexError:
-                time.sleep(0.5)
-        else:
+        message = listener.pop_message(5)
+        if message is None:
             self.fail("Got no message")
+        msg_topic, msg_payload, qos = message
 
         # Check message
         self.assertEqual(msg_topic, topic)
@@ -222,30 +289,19 @@ class MqttServiceTest(unittest.TestCase):
         self.__send_message(mqtt_1, topic, 1)
 
         # Wait for something
-        for _ in range(6):
-            try:
-                msg_topic, msg_payload, qos = listener.messages.pop()
-            except IndexError:
-                time.sleep(0.5)
-            else:
-                # It is possible we got a copy of the previous message
-                # (QOS 1: at least one time)
-                if msg_topic == topic:
-                    self.fail("Got a message that should be filtered: {}".format(msg_topic))
+        # (it is possible we got a copy of the previous message, as QOS 1
+        # means at least one time)
+        self._check_no_message(listener, topic)
 
         # Change topic filter
         lst_reg.set_properties({services.PROP_MQTT_TOPICS: "/pelix/foo/#"})
         payload = self.__send_message(mqtt_1, topic, 1)
 
         # Wait for it
-        for _ in range(10):
-            try:
-                msg_topic, msg_payload, qos = listener.messages.pop()
-                break
-            except IndexError:
-                time.sleep(0.5)
-        else:
+        message = listener.pop_message(5)
+        if message is None:
             self.fail("Got no message")
+        msg_topic, msg_payload, qos = message
 
         # Check message
         self.assertEqual(msg_topic, topic)
@@ -261,13 +317,7 @@ class MqttServiceTest(unittest.TestCase):
         self.__send_message(mqtt_1, topic, 1)
 
         # Wait for something
-        for _ in range(6):
-            try:
-                listener.messages.pop()
-            except IndexError:
-                time.sleep(0.5)
-            else:
-                self.fail("Got an unexpected message")
+        self._check_no_message(listener)
 
         # Clean up
         config.delete()
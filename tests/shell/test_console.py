@@ -6,11 +6,10 @@ Tests the shell console
 :author: Thomas Calmant
 """
 
-import random
-import string
+import re
+import secrets
 import sys
 import threading
-import time
 import unittest
 
 from pelix.utilities import to_bytes, to_str
@@ -41,25 +40,52 @@ else:
         @staticmethod
         def random_str():
             """
-            Generates a random string
+            Generates a random string of hexadecimal characters
 
             :return: A random string
             """
-            data = list(string.ascii_letters)
-            random.shuffle(data)
-            return "".join(data)
+            return secrets.token_hex(26)
 
-        def test_echo(self):
+        @staticmethod
+        def wait_prompt(process, raw_ps1):
             """
-            Tests the console shell 'echo' method
+            Reads the output of the shell until its prompt is printed
+
+            :param process: The shell process
+            :param raw_ps1: The encoded prompt
+            :return: The output read, prompt included
+            :raise IOError: The shell output has been closed
+            """
+            got = bytearray()
+            while raw_ps1 not in got:
+                # Read what is available: the prompt isn't followed by anything
+                data = process.stdout.read1(4096)
+                if not data:
+                    if process.poll():
+                        output = to_str(process.stdout.read())
+                    else:
+                        output = "<no output>"
+
+                    raise IOError("Can't read from stdout (rc={})\n{}".format(process.returncode, output))
+
+                got += data
+
+            return bytes(got)
+
+        @classmethod
+        def setUpClass(cls):
+            """
+            Starts the shell process shared by the interactive tests
             """
             # Get shell PS1 (static method)
             import pelix.shell.core
 
-            ps1 = pelix.shell.core._ShellService.get_ps1()
+            # Look for the encoded prompt, to avoid decoding incomplete
+            # characters
+            cls.raw_ps1 = to_bytes(pelix.shell.core._ShellService.get_ps1())
 
             # Start the shell process
-            process = subprocess.Popen(
+            cls.process = subprocess.Popen(
                 [sys.executable, "-m", "pelix.shell"],
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
@@ -67,71 +93,74 @@ else:
             )
 
             # Avoid being blocked...
-            timer = threading.Timer(5, process.terminate)
+            timer = threading.Timer(5, cls.process.terminate)
             timer.start()
 
-            # Wait for prompt
-            got = ""
-            while ps1 not in got:
-                char = to_str(process.stdout.read(1))
-                if not char:
-                    if sys.version_info[0] == 2:
-                        self.skipTest("Shell console test doesn't work on " "Python 2.7 with Travis")
-                    else:
-                        if process.poll():
-                            output = to_str(process.stdout.read())
-                        else:
-                            output = "<no output>"
-
-                        self.fail("Can't read from stdout (rc={})\n{}".format(process.returncode, output))
-                else:
-                    got += char
-
-            # We should be good
-            timer.cancel()
-
             try:
-                # Try echoing
-                data = self.random_str()
-
-                # Write command
-                process.stdin.write(to_bytes("echo {}\n".format(data)))
-                process.stdin.flush()
-
-                # Read result
-                last_line = to_str(process.stdout.readline()).rstrip()
-                self.assertEqual(last_line, data, "Wrong output")
+                # Wait for prompt
+                cls.wait_prompt(cls.process, cls.raw_ps1)
+            except BaseException:
+                cls.process.kill()
+                cls.process.wait()
+                raise
+            finally:
+                # We should be good
+                timer.cancel()
 
+        @classmethod
+        def tearDownClass(cls):
+            """
+            Stops the shell process
+            """
+            try:
                 # Stop the process
-                process.stdin.write(to_bytes("exit\n"))
-                process.stdin.flush()
+                cls.process.stdin.write(b"exit\n")
+                cls.process.stdin.flush()
 
                 # Wait for the process to stop (1 second max)
-                delta = 0
-                start = time.time()
-                while delta <= 1:
-                    delta = time.time() - start
-                    if process.poll() is not None:
-                        break
-                    time.sleep(0.1)
-                else:
-                    self.fail("Process took too long to stop")
-            finally:
                 try:
-                    # Kill it in any case
-                    process.terminate()
-                    process.wait(1)
-                except OSError:
-                    # Process was already stopped
-                    pass
+                    cls.process.wait(1)
+                except subprocess.TimeoutExpired:
+                    raise AssertionError("Process took too long to stop")
+            finally:
+                if cls.process.poll() is None:
+                    try:
+                        # Kill it if it's still running
+                        cls.process.terminate()
+                        cls.process.wait(1)
+                    except subprocess.TimeoutExpired:
+                        cls.process.kill()
+                        cls.process.wait()
+                    except OSError:
+                        # Process was already stopped
+                        pass
+
+        def test_echo(self):
+            """
+            Tests the console shell 'echo' method
+            """
+            # Try echoing
+            data = self.random_str()
+
+            # Write command
+            self.process.stdin.write(b"echo " + to_bytes(data) + b"\n")
+            self.process.stdin.flush()
+
+            # Read result
+            last_line = to_str(self.process.stdout.readline()).rstrip()
+            self.assertEqual(last_line, data, "Wrong output")
+
+            # Wait for the shell to be ready for the next command
+            self.wait_prompt(self.process, self.raw_ps1)
 
         def test_properties(self):
             """
             Tests the console shell properties parameter
             """
-            # Prepare some properties
-            key1 = self.random_str()[:5]
-            key2 = self.random_str()[:5]
+            # Prepare some properties, with keys long enough not to be found
+            # in the hexadecimal values of other properties, like UUIDs
+            key1 = self.random_str()[:10]
+            key2 = self.random_str()[:10]
 
             val1 = self.random_str()
             val2 = self.random_str()
@@ -148,27 +177,36 @@ else:
                 ],
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
+                encoding="utf-8",
+                errors="replace",
             )
 
             try:
                 # List properties, stop and get output
-                output = to_str(process.communicate(to_bytes("properties"))[0])
+                output = process.communicate("properties", timeout=5)[0]
+
+                # Look for the lines of both keys in a single pass
+                values = {key1: val1, key2: val2}
+                pattern = re.compile(
+                    "^.*?({}|{}).*$".format(re.escape(key1), re.escape(key2)),
+                    re.MULTILINE,
+                )
 
                 found = 0
-                for line in output.splitlines(False):
-                    if key1 in line:
-                        self.assertIn(val1, line)
-                        found += 1
-                    elif key2 in line:
-                        self.assertIn(val2, line)
-                        found += 1
+                for match in pattern.finditer(output):
+                    self.assertIn(values[match.group(1)], match.group(0))
+                    found += 1
 
                 self.assertEqual(found, 2, "Wrong number of properties")
             finally:
-                try:
-                    # Kill it in any case
-                    process.terminate()
-                    process.wait(1)
-                except OSError:
-                    # Process was already stopped
-                    pass
+                if process.poll() is None:
+                    try:
+                        # Kill it if it's still running
+                        process.terminate()
+                        process.wait(1)
+                    except subprocess.TimeoutExpired:
+                        process.kill()
+                        process.wait()
+                    except OSError:
+                        # Process was already stopped
+                        pass
@@ -7,10 +7,12 @@ Tests the shell core module
 """
 
 import os
+import re
 import sys
+import threading
 import unittest
 from io import StringIO
-from typing import Any, List, Optional, Tuple, cast
+from typing import Any, Dict, List, Optional, Tuple, cast
 
 import pelix.constants as constants
 import pelix.shell.beans as beans
@@ -29,6 +31,43 @@ __docformat__ = "restructuredtext en"
 
 # ------------------------------------------------------------------------------
 
+# Shell script starting a remote shell, used by the run command test
+RSHELL_STARTER = os.path.join(os.path.dirname(__file__), "rshell_starter.pelix")
+
+# Name and value of a two-columns table line
+TABLE_ROW = re.compile(r"^\|\s*([^|\s][^|]*?)\s*\|\s*(.*?)\s*\|$", re.MULTILINE)
+
+# Headers of the tables made by the shell utility tests
+TABLE_HEADERS = ("ID", "Name", "Properties")
+
+# Expected result of a simple table, without prefix
+TABLE_SIMPLE_RESULT = """+------+-----------+-----------------+
+|  ID  |   Name    |   Properties    |
++======+===========+=================+
+| 12   | Toto      | {'valid': True} |
++------+-----------+-----------------+
+| True | [1, 2, 3] | (1, 2, 3)       |
++------+-----------+-----------------+
+"""
+
+# Expected result of a simple table, with a prefix
+TABLE_SIMPLE_PREFIX_RESULT = """  +------+-----------+-----------------+
+  |  ID  |   Name    |   Properties    |
+  +======+===========+=================+
+  | 12   | Toto      | {'valid': True} |
+  +------+-----------+-----------------+
+  | True | [1, 2, 3] | (1, 2, 3)       |
+  +------+-----------+-----------------+
+"""
+
+# Expected result of a table without lines
+TABLE_EMPTY_RESULT = """+----+------+------------+
+| ID | Name | Properties |
++====+======+============+
+"""
+
+# ------------------------------------------------------------------------------
+
 
 class ShellUtilsTest(unittest.TestCase):
     """
@@ -39,99 +78,76 @@ class ShellUtilsTest(unittest.TestCase):
     context: BundleContext
     utility: ShellUtils
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpClass(cls) -> None:
         """
-        Starts a framework and install the shell bundle
+        Starts a framework shared by all tests and install the shell bundle
         """
         # Start the framework
-        self.framework = FrameworkFactory.get_framework()
-        self.framework.start()
-        self.context = self.framework.get_bundle_context()
+        cls.framework = FrameworkFactory.get_framework()
+        cls.framework.start()
+        cls.context = cls.framework.get_bundle_context()
 
         # Install the bundle
-        self.context.install_bundle("pelix.shell.core").start()
+        cls.context.install_bundle("pelix.shell.core").start()
 
         # Get the utility service
-        svc_ref = self.context.get_service_reference(ShellUtils)
+        svc_ref = cls.context.get_service_reference(ShellUtils)
         assert svc_ref is not None
-        self.utility = self.context.get_service(svc_ref)
+        cls.utility = cls.context.get_service(svc_ref)
 
-    def tearDown(self) -> None:
+    @classmethod
+    def tearDownClass(cls) -> None:
         """
         Cleans up the framework
         """
-        self.framework.stop()
+        cls.framework.stop()
         FrameworkFactory.delete_framework()
-        self.utility = None  # type: ignore
-        self.context = None  # type: ignore
-        self.framework = None  # type: ignore
+        cls.utility = None  # type: ignore
+        cls.context = None  # type: ignore
+        cls.framework = None  # type: ignore
 
     def testTableSimple(self) -> None:
         """
         Tests a valid table creation
         """
-        headers = ("ID", "Name", "Properties")
         lines = [(12, "Toto", {"valid": True}), (True, [1, 2, 3], (1, 2, 3))]
 
-        # Test without prefix
-        result = """+------+-----------+-----------------+
-|  ID  |   Name    |   Properties    |
-+======+===========+=================+
-| 12   | Toto      | {'valid': True} |
-+------+-----------+-----------------+
-| True | [1, 2, 3] | (1, 2, 3)       |
-+------+-----------+-----------------+
-"""
-        self.assertEqual(self.utility.make_table(headers, lines), result, "Different outputs")
-
-        # Test with prefix
-        result = """  +------+-----------+-----------------+
-  |  ID  |   Name    |   Properties    |
-  +======+===========+=================+
-  | 12   | Toto      | {'valid': True} |
-  +------+-----------+-----------------+
-  | True | [1, 2, 3] | (1, 2, 3)       |
-  +------+-----------+-----------------+
-"""
-        self.assertEqual(self.utility.make_table(headers, lines, "  "), result, "Different outputs")
+        # Test without and with prefix
+        for prefix, result in ((None, TABLE_SIMPLE_RESULT), ("  ", TABLE_SIMPLE_PREFIX_RESULT)):
+            with self.subTest(prefix=prefix):
+                self.assertEqual(
+                    self.utility.make_table(TABLE_HEADERS, lines, prefix), result, "Different outputs"
+                )
 
     def testTableEmpty(self) -> None:
         """
         Tests the creation of an empty table
         """
-        headers = ("ID", "Name", "Properties")
-
-        result = """+----+------+------------+
-| ID | Name | Properties |
-+====+======+============+
-"""
-        self.assertEqual(self.utility.make_table(headers, []), result, "Different outputs")
+        self.assertEqual(self.utility.make_table(TABLE_HEADERS, []), TABLE_EMPTY_RESULT, "Different outputs")
 
     def testTableBadCount(self) -> None:
         """
         Tests the creation of table with different headers/columns count
         """
-        headers = ("ID", "Name", "Properties")
         bad_columns_1 = [(1, 2, 3, 4)]
         bad_columns_2 = [(1, 2, 3), (4, 5)]
 
         self.assertRaises(
-            ValueError, self.utility.make_table, headers, bad_columns_1, "Too many columns accepted"
+            ValueError, self.utility.make_table, TABLE_HEADERS, bad_columns_1, "Too many columns accepted"
         )
 
         self.assertRaises(
-            ValueError, self.utility.make_table, headers, bad_columns_2, "Missing columns accepted"
+            ValueError, self.utility.make_table, TABLE_HEADERS, bad_columns_2, "Missing columns accepted"
         )
 
     def testTableBadType(self) -> None:
         """
         Tests invalid types of line
         """
-        headers = ("ID", "Name", "Properties")
-
         for bad_line in (None, 12, object()):
             self.assertRaises(
-                ValueError, self.utility.make_table, headers, [bad_line], "Bad line type accepted"
+                ValueError, self.utility.make_table, TABLE_HEADERS, [bad_line], "Bad line type accepted"
             )
 
 
@@ -231,13 +247,10 @@ class ShellCoreTest(unittest.TestCase):
         """
         Tests execution of empty or unknown commands
         """
-        # Empty line
-        for empty in (None, "", "   "):
-            self.assertFalse(self.shell.execute(empty), f"No error executing '{empty}'")  # type: ignore
-
-        # Unknown command
-        for unknown in ("unknown", "test.unknown", "unknown.unknown"):
-            self.assertFalse(self.shell.execute(unknown), "No error executing unknown command")
+        # Empty lines and unknown commands
+        for command in (None, "", "   ", "unknown", "test.unknown", "unknown.unknown"):
+            with self.subTest(command=command):
+                self.assertFalse(self.shell.execute(command), f"No error executing '{command}'")  # type: ignore
 
     def testUnregister(self) -> None:
         """
@@ -300,6 +313,24 @@ class ShellCoreTest(unittest.TestCase):
 # ------------------------------------------------------------------------------
 
 
+class CommandService(ShellCommandsProvider):
+    """
+    Command service
+    """
+
+    def __init__(self) -> None:
+        self.flag = False
+
+    def get_namespace(self) -> str:
+        return "test"
+
+    def get_methods(self) -> List[Tuple[str, ShellCommandMethod]]:
+        return [("command", self._command)]
+
+    def _command(self, io_handler: beans.ShellSession) -> None:
+        self.flag = True
+
+
 class ShellCommandTest(unittest.TestCase):
     """
     Tests the shell core service
@@ -308,6 +339,7 @@ class ShellCommandTest(unittest.TestCase):
     framework: Framework
     context: BundleContext
     shell: ShellService
+    session: beans.ShellSession
 
     def setUp(self) -> None:
         """
@@ -326,12 +358,16 @@ class ShellCommandTest(unittest.TestCase):
         assert svc_ref is not None
         self.shell = self.context.get_service(svc_ref)
 
+        # Session shared by the commands of a test
+        self.session = beans.ShellSession(beans.IOHandler(sys.stdin, sys.stdout))
+
     def tearDown(self) -> None:
         """
         Cleans up the framework
         """
         self.framework.stop()
         FrameworkFactory.delete_framework()
+        self.session = None  # type: ignore
         self.shell = None  # type: ignore
         self.context = None  # type: ignore
         self.framework = None  # type: ignore
@@ -351,15 +387,16 @@ class ShellCommandTest(unittest.TestCase):
         self.shell.register_command("test", "command", command)
 
         # Valid execution
-        session = beans.ShellSession(beans.IOHandler(sys.stdin, sys.stdout))
-        self.assertTrue(self.shell.execute("test.command a 2", session))
-        result = session.last_result
+        self.assertTrue(self.shell.execute("test.command a 2", self.session))
+        result = self.session.last_result
         self.assertEqual(result, ("a", "2"))
 
         # Invalid call
         for invalid in ([1], (1, 2, 3)):
             args = " ".join(str(arg) for arg in invalid)
-            self.assertFalse(self.shell.execute("test.command {0}".format(args)), "Invalid call passed")
+            self.assertFalse(
+                self.shell.execute("test.command {0}".format(args), self.session), "Invalid call passed"
+            )
 
     def testKeywords(self) -> None:
         """
@@ -375,8 +412,7 @@ class ShellCommandTest(unittest.TestCase):
         # Register the command
         self.shell.register_command("test", "command", command)
 
-        # Prepare the session
-        session = beans.ShellSession(beans.IOHandler(sys.stdin, sys.stdout))
+        session = self.session
 
         # Valid execution
         self.shell.execute("test.command arg1=12 a=2 b=abc", session)
@@ -398,43 +434,25 @@ class ShellCommandTest(unittest.TestCase):
         self.assertEqual(result, ("15", {"a": "a=b", "b": "a=b"}), f"Invalid result: {result}")
 
         # Invalid call (2 arguments)
-        self.assertFalse(self.shell.execute("test.command 1 2"), "Invalid call passed")
+        self.assertFalse(self.shell.execute("test.command 1 2", session), "Invalid call passed")
 
     def testWhiteboard(self) -> None:
         """
         Tests commands registered by a service
         """
 
-        class CommandService(ShellCommandsProvider):
-
-            """
-            Command service
-            """
-
-            def __init__(self) -> None:
-                self.flag = False
-
-            def get_namespace(self) -> str:
-                return "test"
-
-            def get_methods(self) -> List[Tuple[str, ShellCommandMethod]]:
-                return [("command", self._command)]
-
-            def _command(self, io_handler: beans.ShellSession) -> None:
-                self.flag = True
-
         # Create the service object
         service = CommandService()
 
-        # Check state
-        self.assertFalse(self.shell.execute("test.command"), "'test.command' can be called")
+        # Check state: the command isn't known yet
+        self.assertNotIn("command", self.shell.get_commands("test"), "'test.command' can be called")
         self.assertFalse(service.flag, "Bad flag value")
 
         # Register the service
         svc_reg = self.context.register_service(ShellCommandsProvider, service, {})
 
         # Test execution
-        self.assertTrue(self.shell.execute("test.command"), "Error in executing 'test.command'")
+        self.assertTrue(self.shell.execute("test.command", self.session), "Error in executing 'test.command'")
         self.assertTrue(service.flag, "Command not called")
         service.flag = False
 
@@ -443,7 +461,9 @@ class ShellCommandTest(unittest.TestCase):
         svc_reg = None  # type: ignore
 
         # Check state
-        self.assertFalse(self.shell.execute("test.command"), "'test.command' can still be called")
+        self.assertFalse(
+            self.shell.execute("test.command", self.session), "'test.command' can still be called"
+        )
         self.assertFalse(service.flag, "Bad flag value")
 
 
@@ -459,28 +479,52 @@ class ShellCoreCommandsTest(unittest.TestCase):
     context: BundleContext
     shell: ShellService
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpClass(cls) -> None:
         """
-        Starts a framework and install the shell bundle
+        Starts a framework shared by all tests and install the shell bundle
         """
         # Start the framework
-        self.framework = create_framework(["pelix.shell.core"])
-        self.framework.start()
-        self.context = self.framework.get_bundle_context()
+        cls.framework = create_framework(["pelix.shell.core"])
+        cls.framework.start()
+        cls.context = cls.framework.get_bundle_context()
 
-        svc_ref = self.context.get_service_reference(ShellService)
+        svc_ref = cls.context.get_service_reference(ShellService)
         assert svc_ref is not None
-        self.shell = self.context.get_service(svc_ref)
+        cls.shell = cls.context.get_service(svc_ref)
 
-    def tearDown(self) -> None:
+    @classmethod
+    def tearDownClass(cls) -> None:
         """
         Cleans up the framework
         """
-        self.framework.stop()
+        cls.framework.stop()
         FrameworkFactory.delete_framework()
-        self.shell = None  # type: ignore
-        self.context = None  # type: ignore
-        self.framework = None  # type: ignore
+        cls.shell = None  # type: ignore
+        cls.context = None  # type: ignore
+        cls.framework = None  # type: ignore
+
+    def setUp(self) -> None:
+        """
+        Keeps track of the state of the framework before the test
+        """
+        self._last_bundle_id = max(bundle.get_bundle_id() for bundle in self.context.get_bundles())
+        self._namespaces = set(self.shell.get_namespaces())
+
+        # Session used when a command is run without a specific one
+        self._default_session, self._default_output = self._make_session()
+
+    def tearDown(self) -> None:
+        """
+        Removes the bundles and commands added by the test
+        """
+        # Some bundles uninstall the ones they installed (e.g. iPOPO handlers)
+        for bundle in self.context.get_bundles():
+            if bundle.get_bundle_id() > self._last_bundle_id and bundle.get_state() != Bundle.UNINSTALLED:
+                bundle.uninstall()
+
+        for namespace in set(self.shell.get_namespaces()).difference(self._namespaces):
+            self.shell.unregister(namespace)
 
     def _make_session(self) -> Tuple[beans.ShellSession, StringIO]:
         """
@@ -493,25 +537,37 @@ class ShellCoreCommandsTest(unittest.TestCase):
         session = beans.ShellSession(beans.IOHandler(None, str_output))
         return session, str_output
 
-    def _run_command(self, command: str, *args: Any, **kwargs: Any) -> str:
+    def _run_command(
+        self,
+        command: str,
+        *args: Any,
+        session: Optional[beans.ShellSession] = None,
+        output: Optional[StringIO] = None,
+    ) -> str:
         """
-        Runs the given command and returns the output stream. A keyword
-        argument 'session' can be given to use a custom ShellSession.
+        Runs the given command and returns the output stream. A custom
+        ShellSession can be given with its output stream.
+
+        :raise ValueError: Only one of session and output was given
         """
         # Format command
         if args:
             command = command.format(*args)
 
-        try:
-            # Get the given session
-            session = kwargs["session"]
-            str_output = kwargs["output"]
-            str_output.truncate(0)
-            str_output.seek(0)
-        except KeyError:
+        if session is None:
+            if output is not None:
+                raise ValueError("An output stream was given without its session")
+
             # No session given
-            str_output = StringIO()
-            session = beans.ShellSession(beans.IOHandler(None, str_output))
+            session = self._default_session
+            str_output = self._default_output
+        elif output is None:
+            raise ValueError("A session was given without its output stream")
+        else:
+            str_output = output
+
+        str_output.truncate(0)
+        str_output.seek(0)
 
         # Run command
         self.shell.execute(command, session)
@@ -524,26 +580,33 @@ class ShellCoreCommandsTest(unittest.TestCase):
         # Register some commands
         self.shell.register_command("test", "dummy", self.testHelp)
 
+        # Get the commands of each namespace once
+        namespaces = {
+            namespace: self.shell.get_commands(namespace) for namespace in self.shell.get_namespaces()
+        }
+
         # All commands
         output = self._run_command("help")
-        for namespace in self.shell.get_namespaces():
+        for namespace, commands in namespaces.items():
             self.assertIn(namespace, output)
-            for command in self.shell.get_commands(namespace):
+            for command in commands:
                 self.assertIn(command, output)
 
         # Namespace commands
-        for namespace in self.shell.get_namespaces():
-            output = self._run_command("help {0}", namespace)
-            self.assertIn(namespace, output)
-            for command in self.shell.get_commands(namespace):
-                self.assertIn(command, output)
+        for namespace, commands in namespaces.items():
+            with self.subTest(namespace=namespace):
+                output = self._run_command("help {0}", namespace)
+                self.assertIn(namespace, output)
+                for command in commands:
+                    self.assertIn(command, output)
 
         # Commands
-        for namespace in self.shell.get_namespaces():
-            for command in self.shell.get_commands(namespace):
-                output = self._run_command("help {0}", command)
-                self.assertIn(namespace, output)
-                self.assertIn(command, output)
+        for namespace, commands in namespaces.items():
+            for command in commands:
+                with self.subTest(namespace=namespace, command=command):
+                    output = self._run_command("help {0}", command)
+                    self.assertIn(namespace, output)
+                    self.assertIn(command, output)
 
     def testEcho(self) -> None:
         """
@@ -561,7 +624,7 @@ class ShellCoreCommandsTest(unittest.TestCase):
         var_name = "toto"
 
         session, str_output = self._make_session()
-        kwargs = {"session": session, "output": str_output}
+        kwargs: Dict[str, Any] = {"session": session, "output": str_output}
 
         # No value set yet
         output = self._run_command("set", **kwargs)
@@ -608,9 +671,6 @@ class ShellCoreCommandsTest(unittest.TestCase):
         # Check bad file error
         self.assertFalse(self.shell.execute("run __fake_file__"))
 
-        # Compute test file name
-        filename = os.path.join(os.path.dirname(__file__), "rshell_starter.pelix")
-
         # Install iPOPO
         self.context.install_bundle("pelix.ipopo.core").start()
         self.context.install_bundle("pelix.shell.ipopo").start()
@@ -620,7 +680,7 @@ class ShellCoreCommandsTest(unittest.TestCase):
         session = beans.ShellSession(beans.IOHandler(sys.stdin, sys.stdout), {"port": port})
 
         # Run the file a first time
-        self.assertTrue(self.shell.execute(f"run '{filename}'", session))
+        self.assertTrue(self.shell.execute(f"run '{RSHELL_STARTER}'", session))
 
         # Check the result
         self.assertEqual(session.get("rshell.name"), "rshell")
@@ -636,39 +696,65 @@ class ShellCoreCommandsTest(unittest.TestCase):
             self.assertEqual(int(details["properties"]["pelix.shell.port"]), port)
 
         # Run the file a second time: it must fail
-        self.assertFalse(self.shell.execute("run '{0}'".format(filename), session))
+        self.assertFalse(self.shell.execute("run '{0}'".format(RSHELL_STARTER), session))
 
     def testBundlesInfo(self) -> None:
         """
         Tests the bd and bl commands
         """
         # Install a bundle with another prefix
-        self.context.install_bundle("tests.interfaces")
+        tests_bundle = self.context.install_bundle("tests.interfaces")
+        bundles = self.context.get_bundles()
 
         # List of bundles
         output = self._run_command("bl")
 
-        # Ensure that all bundles have been listed
-        for bundle in self.context.get_bundles():
-            self.assertIn(str(bundle.get_bundle_id()), output)
-            self.assertIn(bundle.get_symbolic_name(), output)
-            self.assertIn(str(bundle.get_version()), output)
+        # Parse the table lines: | ID | Name | State | Version |
+        listed = {}
+        for line in output.splitlines():
+            columns = [column.strip() for column in line.split("|")]
+            if len(columns) == 6 and columns[1].isdigit():
+                listed[int(columns[1])] = (columns[2], columns[4])
+
+        # Ensure that all bundles, including the framework, have been listed
+        self.assertEqual(
+            listed,
+            {
+                bundle.get_bundle_id(): (bundle.get_symbolic_name(), str(bundle.get_version()))
+                for bundle in [self.framework, *bundles]
+            },
+        )
 
         # Test filter by name: all pelix bundles
         for prefix in ("pelix", "tests", "pelix.shell"):
-            output = self._run_command("bl {0}", prefix)
-            for bundle in self.context.get_bundles():
-                name = bundle.get_symbolic_name()
-                if name.startswith(prefix):
-                    self.assertIn(name, output)
+            with self.subTest(prefix=prefix):
+                output = self._run_command("bl {0}", prefix)
+                for bundle in bundles:
+                    name = bundle.get_symbolic_name()
+                    if name.startswith(prefix):
+                        self.assertIn(name, output)
+
+        def details_pattern(bundle: Bundle) -> "re.Pattern[str]":
+            """
+            Bundle ID, name and version, as printed by the bd command
+            """
+            return re.compile(
+                ".*".join(
+                    re.escape(str(value))
+                    for value in (bundle.get_bundle_id(), bundle.get_symbolic_name(), bundle.get_version())
+                ),
+                re.DOTALL,
+            )
 
-        # Test bundle details
-        for bundle in self.context.get_bundles():
-            for selector in (bundle.get_bundle_id(), bundle.get_symbolic_name()):
-                output = self._run_command("bd {0}", selector)
-                self.assertIn(str(bundle.get_bundle_id()), output)
-                self.assertIn(bundle.get_symbolic_name(), output)
-                self.assertIn(str(bundle.get_version()), output)
+        # Test bundle details, selecting bundles by ID
+        for bundle in bundles:
+            with self.subTest(bundle=bundle.get_bundle_id()):
+                output = self._run_command("bd {0}", bundle.get_bundle_id())
+                self.assertRegex(output, details_pattern(bundle))
+
+        # ... and by name
+        output = self._run_command("bd {0}", tests_bundle.get_symbolic_name())
+        self.assertRegex(output, details_pattern(tests_bundle))
 
         # Test invalid bundle
         output = self._run_command("bd {0}", -1)
@@ -740,40 +826,49 @@ class ShellCoreCommandsTest(unittest.TestCase):
         # Get all services references
         svc_refs: Optional[List[ServiceReference[Any]]] = self.context.get_all_service_references(None, None)
         assert svc_refs is not None
+
+        # Read the properties of each service once
+        svc_info = [
+            (
+                str(svc_ref.get_property(constants.SERVICE_ID)),
+                svc_ref.get_property(constants.OBJECTCLASS),
+                svc_ref,
+            )
+            for svc_ref in svc_refs
+        ]
         specs = set()
-        for svc_ref in svc_refs:
-            specs.update(svc_ref.get_property(constants.OBJECTCLASS))
+        for _, svc_specs, _ in svc_info:
+            specs.update(svc_specs)
 
         # List all services
         output = self._run_command("sl")
 
         # Check their presence
-        for svc_ref in svc_refs:
-            self.assertIn(str(svc_ref.get_property(constants.SERVICE_ID)), output)
-            for spec in svc_ref.get_property(constants.OBJECTCLASS):
-                self.assertIn(spec, output)
+        expected = specs.union(svc_id for svc_id, _, _ in svc_info)
+        missing = expected.difference(re.findall(r"[\w.]+", output))
+        self.assertFalse(missing, "Missing services IDs or specifications")
 
         # Check the specification filter
         for spec in specs:
-            output = self._run_command(f"sl {spec}")
-            self.assertIn(spec, output)
-            for svc_ref in svc_refs:
-                svc_id = str(svc_ref.get_property(constants.SERVICE_ID))
-                if spec in svc_ref.get_property(constants.OBJECTCLASS):
-                    self.assertIn(svc_id, output)
+            with self.subTest(spec=spec):
+                output = self._run_command(f"sl {spec}")
+                self.assertIn(spec, output)
+                for svc_id, svc_specs, _ in svc_info:
+                    if spec in svc_specs:
+                        self.assertIn(svc_id, output)
 
         # Check invalid filter
         output = self._run_command("sl <inexistent>")
         self.assertIn("No service provides", output)
 
         # Check details
-        for svc_ref in svc_refs:
-            svc_id = str(svc_ref.get_property(constants.SERVICE_ID))
-            output = self._run_command(f"sd {svc_id}")
-            self.assertIn(svc_id, output)
-            self.assertIn(str(svc_ref.get_bundle()), output)
-            for spec in svc_ref.get_property(constants.OBJECTCLASS):
-                self.assertIn(spec, output)
+        for svc_id, svc_specs, svc_ref in svc_info:
+            with self.subTest(service=svc_id):
+                output = self._run_command(f"sd {svc_id}")
+                self.assertIn(svc_id, output)
+                self.assertIn(str(svc_ref.get_bundle()), output)
+                for spec in svc_specs:
+                    self.assertIn(spec, output)
 
         # Invalid IDs
         for invalid in (-1, "<invalid>", "-10"):
@@ -787,14 +882,7 @@ class ShellCoreCommandsTest(unittest.TestCase):
         output = self._run_command("properties")
 
         # Extract all properties
-        props = {}
-        for line in output.split("\n"):
-            if line.startswith("|"):
-                # Value line, name column
-                values = line.split("|")
-                name, value = values[1].strip(), values[2].strip()
-                if name and name != "Property Name":
-                    props[name] = value
+        props = {name: value for name, value in TABLE_ROW.findall(output) if name != "Property Name"}
 
         # Check their values
         for name, value in self.framework.get_properties().items():
@@ -816,15 +904,7 @@ class ShellCoreCommandsTest(unittest.TestCase):
         output = self._run_command("sysprops")
 
         # Extract all variables
-        props = {}
-        for line in output.split("\n"):
-            if line.startswith("|"):
-                # Value line, name column
-                idx_separator = line.find("|", 1)
-                name = line[1:idx_separator].strip()
-                value = line[idx_separator + 1 : -1].strip()
-                if name and name != "Environment Variable":
-                    props[name] = value
+        props = {name: value for name, value in TABLE_ROW.findall(output) if name != "Environment Variable"}
 
         # Check their values
         for name, value in os.environ.items():
@@ -853,14 +933,17 @@ class ShellCoreCommandsTest(unittest.TestCase):
 
         # Get all threads
         threads = []
-        for line in output.split("\n"):
+        for line in output.splitlines():
             if line.startswith("Thread ID:"):
                 thread_id = int(line.split(":")[1].split("-")[0])
                 threads.append(thread_id)
 
-        # Check each thread
-        for thread_id in threads:
-            output = self._run_command(f"thread {thread_id}")
+        # Check the details of the current thread: other ones might have
+        # stopped since the listing
+        current_id = threading.get_ident()
+        self.assertIn(current_id, threads)
+        output = self._run_command(f"thread {current_id}")
+        self.assertIn(f"Thread ID: {current_id}", output)
 
         # Check invalid thread
         output = self._run_command("thread -1")
@@ -8,12 +8,14 @@ Tests the shell report module
 
 import json
 import os
+import shutil
+import tempfile
 import unittest
 from io import StringIO
 from typing import Any, Tuple, cast
 
 import pelix.shell.beans as beans
-from pelix.framework import BundleContext, Framework, FrameworkFactory, create_framework
+from pelix.framework import Bundle, BundleContext, Framework, FrameworkFactory, create_framework
 from pelix.shell import ShellReport, ShellService
 
 # ------------------------------------------------------------------------------
@@ -36,46 +38,71 @@ class ShellReportTest(unittest.TestCase):
     context: BundleContext
     report: ShellReport
     shell: ShellService
+    out_dir: str
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpClass(cls) -> None:
         """
-        Starts a framework and install the shell bundle
+        Starts a framework shared by all tests and install the shell bundles
         """
-        # Start the framework
-        self.framework = create_framework(["pelix.shell.core", "pelix.shell.report"])
-        self.framework.start()
-        self.context = self.framework.get_bundle_context()
+        # Start the framework (class cleanups are called in reverse order)
+        cls.framework = create_framework(["pelix.shell.core", "pelix.shell.report"])
+        cls.addClassCleanup(FrameworkFactory.delete_framework)
+        cls.framework.start()
+        cls.addClassCleanup(cls.framework.stop)
+        cls.context = cls.framework.get_bundle_context()
 
         # Shell service
-        shell_ref = self.context.get_service_reference(ShellService)
+        shell_ref = cls.context.get_service_reference(ShellService)
         assert shell_ref is not None
-        self.shell = self.context.get_service(shell_ref)
+        cls.shell = cls.context.get_service(shell_ref)
 
         # Report service
-        report_ref = self.context.get_service_reference(ShellReport)
+        report_ref = cls.context.get_service_reference(ShellReport)
         assert report_ref is not None
-        self.report = self.context.get_service(report_ref)
+        cls.report = cls.context.get_service(report_ref)
+
+        # Folder of the output file, out of the working directory
+        cls.out_dir = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.out_dir)
+
+    def setUp(self) -> None:
+        """
+        Prepares the output file and forgets the previous report
+        """
+        # Keep track of the bundles installed by the test
+        self._last_bundle_id = max(bundle.get_bundle_id() for bundle in self.context.get_bundles())
 
         # Output file
-        self.out_file = "report_output.js"
-        if os.path.exists(self.out_file):
-            os.remove(self.out_file)
+        self.out_file = os.path.join(self.out_dir, "report_output.js")
+        self._remove_out_file()
+
+        # Session used when a command is run without a specific one
+        self._default_session, self._default_output = self._make_session()
+
+        # Start without report
+        self._run_command("report.clear")
 
     def tearDown(self) -> None:
         """
-        Cleans up the framework
+        Removes the output file and the bundles installed by the test
         """
-        self.framework.stop()
-        FrameworkFactory.delete_framework()
+        # Some bundles uninstall the ones they installed (e.g. iPOPO handlers)
+        for bundle in self.context.get_bundles():
+            if bundle.get_bundle_id() > self._last_bundle_id and bundle.get_state() != Bundle.UNINSTALLED:
+                bundle.uninstall()
 
         # Remove the output file
-        if os.path.exists(self.out_file):
-            os.remove(self.out_file)
+        self._remove_out_file()
 
-        self.report = None  # type: ignore
-        self.shell = None  # type: ignore
-        self.context = None  # type: ignore
-        self.framework = None  # type: ignore
+    def _remove_out_file(self) -> None:
+        """
+        Removes the output file, if it exists
+        """
+        try:
+            os.remove(self.out_file)
+        except FileNotFoundError:
+            pass
 
     def _make_session(self) -> Tuple[beans.ShellSession, StringIO]:
         """
@@ -88,25 +115,22 @@ class ShellReportTest(unittest.TestCase):
         session = beans.ShellSession(beans.IOHandler(None, str_output))
         return session, str_output
 
-    def _run_command(self, command: str, *args: Any, **kwargs: Any) -> str:
+    def _run_command(self, command: str, **kwargs: Any) -> str:
         """
         Runs the given command and returns the output stream. A keyword
         argument 'session' can be given to use a custom ShellSession.
         """
-        # Format command
-        if args:
-            command = command.format(*args)
-
         try:
             # Get the given session
             session = kwargs["session"]
             str_output = kwargs["output"]
-            str_output.truncate(0)
-            str_output.seek(0)
         except KeyError:
             # No session given
-            str_output = StringIO()
-            session = beans.ShellSession(beans.IOHandler(None, str_output))
+            session = self._default_session
+            str_output = self._default_output
+
+        str_output.truncate(0)
+        str_output.seek(0)
 
         # Run command
         self.shell.execute(command, session)
@@ -131,22 +155,24 @@ class ShellReportTest(unittest.TestCase):
         """
         for bad_level in (12, "bad level", "'<some unknown level>'"):
             for command in ("make", "show"):
-                output = self._run_command("report.{0} {1}".format(command, bad_level))
-                self.assertIn("Unknown report level", output)
+                with self.subTest(bad_level=bad_level, command=command):
+                    output = self._run_command(f"report.{command} {bad_level}")
+                    self.assertIn("Unknown report level", output)
 
     def test_report_info(self) -> None:
         """
         Check if the report description is stored for every level
         """
         for level in self.report.get_levels():
-            # Run the 'show' command, to get the output
-            output = self._run_command("report.show {0}".format(level))
-            parsed = json.loads(output)
+            with self.subTest(level=level):
+                # Run the 'show' command, to get the output
+                output = self._run_command(f"report.show {level}")
+                parsed = json.loads(output)
 
-            # Check mandatory keys
-            self.assertEqual(parsed["report"]["report.levels"], [level])
-            for report_key in ("time.stamp", "time.local", "time.utc"):
-                self.assertIn(report_key, parsed["report"])
+                # Check mandatory keys
+                self.assertEqual(parsed["report"]["report.levels"], [level])
+                for report_key in ("time.stamp", "time.local", "time.utc"):
+                    self.assertIn(report_key, parsed["report"])
 
     def test_full_report(self) -> None:
         """
@@ -177,7 +203,7 @@ class ShellReportTest(unittest.TestCase):
         self.assertFalse(os.path.exists(self.out_file))
 
         # Run the command without any report
-        output = self._run_command("report.write {0}".format(self.out_file))
+        output = self._run_command(f"report.write {self.out_file}")
         self.assertIn("No report", output)
         self.assertFalse(os.path.exists(self.out_file))
 
@@ -185,7 +211,7 @@ class ShellReportTest(unittest.TestCase):
         report_content = self._run_command("report.show full")
 
         # Write it down
-        self._run_command("report.write {0}".format(self.out_file))
+        self._run_command(f"report.write {self.out_file}")
         self.assertTrue(os.path.exists(self.out_file))
 
         # Check content
@@ -200,7 +226,7 @@ class ShellReportTest(unittest.TestCase):
 
         # Make a report and write it down
         self._run_command("report.make minimal")
-        self._run_command("report.write {0}".format(self.out_file))
+        self._run_command(f"report.write {self.out_file}")
 
         # Assert it's there
         self.assertTrue(os.path.exists(self.out_file))
@@ -210,7 +236,7 @@ class ShellReportTest(unittest.TestCase):
         self._run_command("report.clear")
 
         # Run the command without any report
-        output = self._run_command("report.write {0}".format(self.out_file))
+        output = self._run_command(f"report.write {self.out_file}")
         self.assertIn("No report", output)
         self.assertFalse(os.path.exists(self.out_file))
 
@@ -15,11 +15,13 @@ __docformat__ = "restructuredtext en"
 
 # ------------------------------------------------------------------------------
 
+import collections
+import itertools
 import random
 import threading
 import time
 import unittest
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 import pelix.constants
 import pelix.framework
@@ -28,6 +30,11 @@ from tests.interfaces import IEchoService
 
 # ------------------------------------------------------------------------------
 
+# Empty instances of the iterable types kept as is by to_iterable()
+EMPTY_ITERABLES: Tuple[Any, ...] = (list(), tuple(), set(), frozenset())
+
+# ------------------------------------------------------------------------------
+
 
 class SynchronizationUtilitiesTest(unittest.TestCase):
     """
@@ -73,8 +80,15 @@ class SynchronizationUtilitiesTest(unittest.TestCase):
 
         :param no_lock: If True, create the lock, else let the decorator do it
         """
-        # Thread results: ID -> starting time
-        result: Dict[int, float] = {}
+        # Thread results: ID -> (entry step, exit step)
+        result: Dict[int, Tuple[int, int]] = {}
+        steps = itertools.count()
+
+        # Set when the first thread holds the lock
+        acquired = threading.Event()
+
+        # Set when the first thread can leave the synchronized method
+        release = threading.Event()
 
         # Synchronization lock
         if no_lock:
@@ -83,51 +97,44 @@ class SynchronizationUtilitiesTest(unittest.TestCase):
             lock = threading.Lock()
 
         @utilities.Synchronized(lock)
-        def sleeper(wait: float, sleep_id: int) -> None:
+        def sleeper(wait: bool, sleep_id: int) -> None:
             """
-            Sleeps during *wait* seconds
+            Waits for the release event if *wait* is True
             """
             if lock is not None:
                 self.assertFalse(lock.acquire(False), "Lock not locked")
 
-            result[sleep_id] = time.time()
-            time.sleep(wait)
-
-        # Get first call time
-        start = time.time()
+            entry = next(steps)
+            if wait:
+                acquired.set()
+                release.wait(5)
+            result[sleep_id] = (entry, next(steps))
 
         # Launch first waiter
-        thread1 = threading.Thread(target=sleeper, args=(0.5, 1))
+        thread1 = threading.Thread(target=sleeper, args=(True, 1))
         thread1.start()
 
-        # Wait a little before starting 2nd thread: on Windows, thread 2
-        # can start before thread 1
-        time.sleep(0.1)
+        # Start the 2nd thread once the 1st one holds the lock
+        self.assertTrue(acquired.wait(5), "Thread 1 didn't enter the method")
 
         # Launch second waiter
-        thread2 = threading.Thread(target=sleeper, args=(0, 2))
+        thread2 = threading.Thread(target=sleeper, args=(False, 2))
         thread2.start()
 
-        # Get intermediate time
-        interm = time.time()
+        # Thread 2 must be blocked by the lock, but not the main thread
+        thread2.join(0.1)
+        self.assertTrue(thread2.is_alive(), "Thread 2 wasn't blocked by the lock")
+        self.assertNotIn(2, result, "Thread 2 started too soon")
+
+        # Let thread 1 leave the synchronized method
+        release.set()
 
         # Wait for threads
         for thread in (thread1, thread2):
             thread.join()
 
-        # Validate conditions :
-        # .. Thread 1 started after start (obvious)
-        self.assertGreaterEqual(result[1], start, "Thread 1 started too soon")
-
-        # .. Thread 2 started at least 0.4 secs after thread 1
-        # (due to the lock)
-        # (0.4 instead of 0.5: some systems are not that precise)
-        self.assertGreaterEqual(
-            result[2], result[1] + 0.4, "Thread 2 started too soon (after {0}s)".format(result[2] - result[1])
-        )
-
-        # .. Thread 2 must not have blocked the main thread
-        self.assertGreater(result[2], interm, "Thread 2 blocked the main thread")
+        # Thread 2 entered the method after thread 1 left it
+        self.assertLess(result[1][1], result[2][0], "Thread 2 started too soon")
 
     def testSynchronizedMethod2(self) -> None:
         """
@@ -232,17 +239,18 @@ class UtilitiesTest(unittest.TestCase):
         max_value = 4
 
         # Create a random list
-        list_org = []
-        for i in range(0, random.randint(10, 20)):
-            list_org.append(random.randint(min_value, max_value))
+        list_org = random.choices(range(min_value, max_value + 1), k=random.randint(10, 20))
 
         # Create a copy
         list_copy = list_org[:]
 
+        # Count the occurrences of each value in the original list
+        counts = collections.Counter(list_org)
+
         # Pick a random element
         for i in range(min_value, max_value + 1):
             # Get the original count
-            count_base = list_org.count(i)
+            count_base = counts[i]
             self.assertEqual(list_copy.count(i), count_base, "Copies doesn't have the same count of values")
 
             # Get the current length of the copy
@@ -378,8 +386,7 @@ class UtilitiesTest(unittest.TestCase):
         self.assertListEqual(utilities.to_iterable(None, False), [], "None value accepted")  # type: ignore
 
         # Check iterable types
-        for clazz in (list, tuple, set, frozenset):
-            iterable = clazz()
+        for iterable in EMPTY_ITERABLES:
             self.assertIs(
                 utilities.to_iterable(iterable), iterable, "to_iterable() didn't returned the original object"
             )